@@ -20,9 +20,17 @@ import webbrowser
 
 from nvlib.controller.plugin.plugin_base import PluginBase
 from nvlib.gui.menus.nv_menu import NvMenu
+from nvzim.nvzim_globals import LAYOUT_FLAT
+from nvzim.nvzim_globals import LAYOUT_NAMESPACES
+from nvzim.nvzim_globals import LAYOUT_SHARDED
+from nvzim.nvzim_globals import ZIM_AUTOLINK_TAG
+from nvzim.nvzim_globals import ZIM_LAYOUT_TAG
 from nvzim.nvzim_locale import _
+from nvzim.nvzim_locale import lazy_
 from nvzim.platform.platform_settings import MOUSE
 from nvzim.wiki_manager import WikiManager
+# inlined by the package builder, so not deferred; see CONTRIBUTING.md
+from nvzim.zim_page import ZimPage
 import tkinter as tk
 
 
@@ -34,7 +42,8 @@ class Plugin(PluginBase):
     URL = 'https://github.com/peter88213/nv_zim'
 
     FEATURE = 'Zim Desktop Wiki'
-    HELP_URL = f'{_("https://peter88213.github.io/nvhelp-en")}/nv_zim'
+    HELP_URL = lazy_('https://peter88213.github.io/nvhelp-en') + '/nv_zim'
+    # help site in the user's language
 
     def install(self, model, view, controller):
         """Install the plugin.
@@ -47,12 +56,8 @@ class Plugin(PluginBase):
         Extends the superclass method.
         """
         super().install(model, view, controller)
-        self.wikiManager = WikiManager(
-            model,
-            view,
-            controller,
-            self.FEATURE
-        )
+        self._wikiManager = None
+        # created on first use; see _get_wiki_manager()
         self._icon = self._get_icon('zim.png')
 
         #--- Configure the main menu.
@@ -83,6 +88,65 @@ class Plugin(PluginBase):
         )
         self.zimMenu.disableOnLock.append(label)
 
+        label = _('Preview project wiki creation')
+        self.zimMenu.add_command(
+            label=label,
+            command=self.show_wiki_plan,
+        )
+
+        label = _('Synchronize project wiki')
+        self.zimMenu.add_command(
+            label=label,
+            command=self.sync_project_wiki,
+        )
+        self.zimMenu.disableOnLock.append(label)
+
+        label = _('Import from wiki')
+        self.zimMenu.add_command(
+            label=label,
+            command=self.import_from_wiki,
+        )
+        self.zimMenu.disableOnLock.append(label)
+
+        label = _('Check and repair wiki links')
+        self.zimMenu.add_command(
+            label=label,
+            command=self.check_wiki_links,
+        )
+        self.zimMenu.disableOnLock.append(label)
+
+        # Create a "Page layout" submenu.
+        self.pageLayout = tk.StringVar(value=LAYOUT_FLAT)
+        self.layoutMenu = tk.Menu(
+            tearoff=0,
+            postcommand=self._update_page_layout,
+        )
+        for layout, label in (
+            (LAYOUT_FLAT, _('All pages in the home namespace')),
+            (LAYOUT_NAMESPACES, _('One namespace per element type')),
+            (LAYOUT_SHARDED, _('Namespaces by element type and initial')),
+        ):
+            self.layoutMenu.add_radiobutton(
+                label=label,
+                variable=self.pageLayout,
+                value=layout,
+                command=self.set_page_layout,
+            )
+        self.layoutMenu.add_separator()
+        self.autoLink = tk.BooleanVar(value=False)
+        self.layoutMenu.add_checkbutton(
+            label=_('Link element names in the page text'),
+            variable=self.autoLink,
+            command=self.set_auto_link,
+        )
+
+        label = _('Page layout')
+        self.zimMenu.add_cascade(
+            label=label,
+            menu=self.layoutMenu,
+        )
+        self.zimMenu.disableOnLock.append(label)
+
         self.zimMenu.add_separator()
 
         # Create a "Remove wiki links" submenu.
@@ -107,6 +171,22 @@ class Plugin(PluginBase):
         )
         self.zimMenu.disableOnLock.append(label)
 
+        self.zimMenu.add_separator()
+
+        self.recordDiagnostics = tk.BooleanVar(value=False)
+        label = _('Record diagnostics')
+        self.zimMenu.add_checkbutton(
+            label=label,
+            variable=self.recordDiagnostics,
+            command=self.toggle_diagnostics,
+        )
+
+        label = _('Zim diagnostics')
+        self.zimMenu.add_command(
+            label=label,
+            command=self.show_diagnostics,
+        )
+
         # Add the "Zim wiki" submenu to the Tools menu.
         label = _('Zim Desktop Wiki')
         self._ui.toolsMenu.add_cascade(
@@ -134,38 +214,71 @@ class Plugin(PluginBase):
             disableOnLock=False,
         ).pack(side='left')
 
+    def check_wiki_links(self, event=None):
+        self._get_wiki_manager().check_links()
+
     def create_project_wiki(self, event=None):
-        self.wikiManager.create_project_wiki()
+        self._get_wiki_manager().create_project_wiki()
+
+    def import_from_wiki(self, event=None):
+        self._get_wiki_manager().import_from_wiki()
 
     def lock(self):
         self.zimMenu.lock()
 
     def on_close(self):
-        self.wikiManager.on_close()
+        if self._wikiManager is not None:
+            self._wikiManager.on_close()
 
     def open_element_page(self, event=None):
-        self.wikiManager.open_element_page()
+        self._get_wiki_manager().open_element_page()
 
     def open_help(self, event=None):
-        webbrowser.open(self.HELP_URL)
+        webbrowser.open(str(self.HELP_URL))
 
     def open_link(self, filePath):
-        return self.wikiManager.open_page_file(filePath)
+        if not filePath.endswith(ZimPage.EXTENSION):
+            # Not a wiki page; leave the link to other openers.
+            return False
+
+        return self._get_wiki_manager().open_page_file(filePath)
 
     def open_page_file(self, event=None):
-        self.wikiManager.open_page_file()
+        self._get_wiki_manager().open_page_file()
 
     def open_project_wiki(self, event=None):
-        self.wikiManager.open_project_wiki()
+        self._get_wiki_manager().open_project_wiki()
 
     def remove_all_wiki_links(self, event=None):
-        self.wikiManager.remove_all_links()
+        self._get_wiki_manager().remove_all_links()
 
     def remove_page_link(self, event=None):
-        self.wikiManager.remove_page_link_after_asking()
+        self._get_wiki_manager().remove_page_link_after_asking()
 
     def remove_selected_page_links(self, event=None):
-        self.wikiManager.remove_selected_page_links()
+        self._get_wiki_manager().remove_selected_page_links()
+
+    def set_auto_link(self, event=None):
+        self._get_wiki_manager().set_auto_link(self.autoLink.get())
+        self._update_page_layout()
+
+    def set_page_layout(self, event=None):
+        self._get_wiki_manager().set_page_layout(self.pageLayout.get())
+        self._update_page_layout()
+
+    def show_diagnostics(self, event=None):
+        self._get_wiki_manager().show_diagnostics()
+
+    def show_wiki_plan(self, event=None):
+        self._get_wiki_manager().show_wiki_plan()
+
+    def sync_project_wiki(self, event=None):
+        self._get_wiki_manager().sync_project_wiki()
+
+    def toggle_diagnostics(self, event=None):
+        wikiManager = self._get_wiki_manager()
+        if not wikiManager.set_diagnostics(self.recordDiagnostics.get()):
+            self.recordDiagnostics.set(False)
 
     def unlock(self):
         self.zimMenu.unlock()
@@ -193,3 +306,25 @@ class Plugin(PluginBase):
             if enableHovertips:
                 Hovertip(zimButton, zimButton['text'])
 
+    def _get_wiki_manager(self):
+        """Return the wiki manager, creating it on first use."""
+        if self._wikiManager is None:
+            self._wikiManager = WikiManager(
+                self._mdl,
+                self._ui,
+                self._ctrl,
+                self.FEATURE
+            )
+        return self._wikiManager
+
+    def _update_page_layout(self):
+        """Show the project's page settings in the "Page layout" submenu."""
+        if self._mdl.novel is None:
+            return
+
+        self.pageLayout.set(
+            self._mdl.novel.fields.get(ZIM_LAYOUT_TAG, LAYOUT_FLAT)
+        )
+        self.autoLink.set(
+            bool(self._mdl.novel.fields.get(ZIM_AUTOLINK_TAG, None))
+        )
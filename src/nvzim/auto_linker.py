@@ -0,0 +1,228 @@
+"""Provide a class for linking element names in page text.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from collections import deque
+import re
+
+
+class AutoLinker:
+    """Turn the mentions of element names into links to the element pages.
+
+    All names are matched in a single pass by an Aho-Corasick automaton,
+    so the time for linking a text grows with the text length,
+    not with the number of names.
+    Names are matched case sensitive, and as whole words only.
+    Of overlapping mentions, the leftmost and then the longest is linked.
+    Text within existing links and URLs is left as it is.
+
+    The automaton is not changed after it is built, so it can be
+    used by several threads rendering pages at the same time.
+    """
+    MIN_LENGTH = 2
+    # names shorter than this are not linked
+    PROTECTED_PATTERN = re.compile(r'\[\[.*?\]\]|\w+://\S+')
+    # regex for the links and URLs where no names are linked
+
+    def __init__(self, homeNamespace):
+        """Set up an automaton without names.
+
+        Positional arguments:
+            homeNamespace: str -- Name of the home namespace.
+        """
+        self.homeNamespace = homeNamespace
+        self._goto = [{}]
+        # index: state; the initial state is 0
+        # value: dict(character: next state)
+        self._fail = [0]
+        # index: state
+        # value: state with the longest proper suffix of the state's path
+        self._lengths = [0]
+        # index: state
+        # value: length of the name ending in the state, or 0
+        self._outputs = [0]
+        # index: state
+        # value: next state along the failure chain where a name ends, or 0
+        self._targets = [None]
+        # index: state
+        # value: (element, link target) of the name ending in the state
+
+    def add_name(self, name, element, target):
+        """Add a name to the automaton; return True if added.
+
+        Positional arguments:
+            name: str -- Element name to be linked.
+            element -- The element, whose page is not linked to itself.
+            target: str -- Page link target, relative to the home namespace.
+
+        A name already added keeps its first target.
+        Call build() or compile() afterwards.
+        """
+        if (
+            not name
+            or len(name) < self.MIN_LENGTH
+            or '|' in name
+            or '[' in name
+            or ']' in name
+            or '\n' in name
+        ):
+            return False
+
+        state = 0
+        for char in name:
+            nextState = self._goto[state].get(char, None)
+            if nextState is None:
+                nextState = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._lengths.append(0)
+                self._outputs.append(0)
+                self._targets.append(None)
+                self._goto[state][char] = nextState
+            state = nextState
+        if self._lengths[state]:
+            return False
+
+        self._lengths[state] = len(name)
+        self._targets[state] = (element, target)
+        return True
+
+    def build(self, elementDescriptors):
+        """Build the automaton from the elements' names.
+
+        Positional arguments:
+            elementDescriptors -- iterable of (element, PageDescriptor)
+                                  tuples, in the novel's order.
+
+        The names are the element's title, full name, and aka.
+        An element whose page has no valid name is not linked to.
+        A name shared by several elements links the first one.
+        """
+        for element, descriptor in elementDescriptors:
+            if descriptor.fileName is None:
+                continue
+
+            target = descriptor.get_link()
+            for name in (
+                element.title,
+                getattr(element, 'fullName', None),
+                element.aka,
+            ):
+                self.add_name(name, element, target)
+        self.compile()
+
+    def compile(self):
+        """Compute the failure and output links, breadth first."""
+        pending = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            self._outputs[state] = 0
+            pending.append(state)
+        while pending:
+            state = pending.popleft()
+            for char, nextState in self._goto[state].items():
+                pending.append(nextState)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fallback = self._goto[fallback].get(char, 0)
+                self._fail[nextState] = fallback
+                if self._lengths[fallback]:
+                    self._outputs[nextState] = fallback
+                else:
+                    self._outputs[nextState] = self._outputs[fallback]
+
+    def link(self, text, element=None):
+        """Return text with the mentions of element names linked.
+
+        Positional arguments:
+            text: str -- Page text, possibly with links and URLs.
+
+        Optional arguments:
+            element -- The element the page belongs to;
+                       its own names are not linked.
+        """
+        if not text or len(self._goto) == 1:
+            return text
+
+        if '[[' not in text and '://' not in text:
+            return self._link_plain(text, element)
+
+        chunks = []
+        position = 0
+        for match in self.PROTECTED_PATTERN.finditer(text):
+            chunks.append(
+                self._link_plain(text[position:match.start()], element)
+            )
+            chunks.append(match.group())
+            position = match.end()
+        chunks.append(self._link_plain(text[position:], element))
+        return ''.join(chunks)
+
+    def _find_mentions(self, text):
+        """Return a list of (start, end, state) tuples of the name matches.
+
+        The list is sorted by start position, longest match first.
+        """
+        goto = self._goto
+        fail = self._fail
+        lengths = self._lengths
+        outputs = self._outputs
+        mentions = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if lengths[state]:
+                match = state
+            else:
+                match = outputs[state]
+            while match:
+                start = end - lengths[match]
+                if self._is_word(text, start, end):
+                    mentions.append((start, end, match))
+                match = outputs[match]
+        mentions.sort(key=lambda mention: (mention[0], -mention[1]))
+        return mentions
+
+    def _is_word(self, text, start, end):
+        """Return True if text[start:end] is not part of a longer word."""
+        if start > 0:
+            char = text[start - 1]
+            if char.isalnum() or char == '_':
+                return False
+
+        if end < len(text):
+            char = text[end]
+            if char.isalnum() or char == '_':
+                return False
+
+        return True
+
+    def _link_plain(self, text, element):
+        """Return text without links and URLs, with the mentions linked."""
+        chunks = []
+        position = 0
+        for start, end, state in self._find_mentions(text):
+            if start < position:
+                # overlapping a mention already processed
+                continue
+
+            chunks.append(text[position:start])
+            owner, target = self._targets[state]
+            if owner is element:
+                # The page's own names are not linked.
+                chunks.append(text[start:end])
+            else:
+                chunks.append(
+                    f'[[:{self.homeNamespace}:{target}|{text[start:end]}]]'
+                )
+            position = end
+        if not chunks:
+            return text
+
+        chunks.append(text[position:])
+        return ''.join(chunks)
@@ -4,58 +4,325 @@ Copyright (c) 2025 Peter Triesberger
 For further information see https://github.com/peter88213/nv_zim
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
+from bisect import insort
 import os
 from nvlib.novx_globals import CHARACTER_PREFIX
 from nvlib.novx_globals import ITEM_PREFIX
 from nvlib.novx_globals import LOCATION_PREFIX
 from nvzim.character_page import CharacterPage
+from nvzim.diagnostics import DIAGNOSTICS
+from nvzim.nvzim_locale import N_
 from nvzim.nvzim_locale import _
 from nvzim.world_element_page import WorldElementPage
 from nvzim.zim_page import ZimPage
 
 
 class BookPage(ZimPage):
+    __slots__ = ('links',)
+
+    LINK_SECTIONS = (
+        (CHARACTER_PREFIX, N_('Characters')),
+        (LOCATION_PREFIX, N_('Locations')),
+        (ITEM_PREFIX, N_('Items')),
+    )
+    # element ID prefix and heading of the link sections, in page order
+
+    def __init__(self, filePath, element):
+        super().__init__(filePath, element)
+        self.links = None
+        # key: element ID prefix
+        # value: sorted list of link lines
+
+    def add_link(self, elemId, pageName):
+        """Add a link to the element's page; return True if added.
+
+        Positional arguments:
+            elemId: str -- ID of the element the page belongs to.
+            pageName: str -- Page name relative to the home namespace.
+        """
+        sectionLinks = self.links[elemId[:2]]
+        link = self._get_link(pageName)
+        if link in sectionLinks:
+            return False
+
+        insort(sectionLinks, link)
+        return True
+
+    def collect_links(self, descriptors=None, pageFiles=None):
+        """Build the link sections from the existing element pages.
+
+        Optional arguments:
+            descriptors -- iterable of the elements' PageDescriptor instances.
+                           By default, they are computed from the novel.
+            pageFiles -- set of the page file paths relative to the
+                         home directory. By default, the namespace
+                         directories of the element pages are listed.
+
+        The file paths are compared case-insensitively,
+        if the file system is.
+        """
+        if descriptors is None:
+            descriptors = list(self._get_descriptors())
+        if pageFiles is None:
+            pageFiles = self._get_page_files(
+                set(descriptor.namespace for descriptor in descriptors)
+            )
+        else:
+            pageFiles = set(os.path.normcase(pageFile) for pageFile in pageFiles)
+        self.links = {}
+        for prefix, __ in self.LINK_SECTIONS:
+            self.links[prefix] = []
+        for descriptor in descriptors:
+            sectionLinks = self.links.get(descriptor.elemId[:2], None)
+            if (
+                sectionLinks is not None
+                and descriptor.fileName is not None
+                and os.path.normcase(descriptor.get_rel_path()) in pageFiles
+            ):
+                sectionLinks.append(self._get_link(descriptor.get_link()))
+        for sectionLinks in self.links.values():
+            sectionLinks.sort()
+
+    def iter_content(self):
+        """Generate the page content lines.
 
-    def fill_page(self, lines):
-        """Add page content to the lines.
-        
         Overrides the superclass method.
         """
         if self.element.desc:
-            lines.append(self.element.desc)
-            lines.append('\n')
-            self._add_links(self.element.characters, _('Characters'), lines)
-            self._add_links(self.element.locations, _('Locations'), lines)
-            self._add_links(self.element.items, _('Items'), lines)
-
-    def _add_links(self, elements, heading, lines):
-        """Add links to existent pages to the lines."""
-        linkLines = []
-        homeDir = os.path.dirname(self.filePath)
-        for elemId in elements:
-            elemPage = self._new_zim_page(elements[elemId], elemId)
-            pageName = elemPage.new_page_name()
-            filePath = (
-                f"{homeDir}/{pageName.replace(' ', '_')}"
-                f"{elemPage.EXTENSION}"
+            yield self.element.desc
+            yield '\n'
+            if self.links is None:
+                self.collect_links()
+            for prefix, heading in self.LINK_SECTIONS:
+                if self.links[prefix]:
+                    yield self.get_h2(_(heading))
+                    yield from self.links[prefix]
+                    yield '\n'
+
+    def read_links(self):
+        """Load the link sections from the existing book page file.
+
+        This is much cheaper than collecting the links,
+        because the element pages are not looked up.
+        Only the lines consisting of a single link are loaded;
+        links within text lines are not considered.
+        """
+        self.links = {}
+        for prefix, __ in self.LINK_SECTIONS:
+            self.links[prefix] = []
+        lines = self._read_lines()
+        for prefix, (start, end) in self._find_link_sections(lines).items():
+            self.links[prefix] = sorted(
+                line for line in lines[start + 1:end]
+                if self._is_link_line(line)
             )
-            if os.path.isfile(filePath):
-                linkLines.append(f'[[{pageName}]]')
-        if linkLines:
-            lines.append(self.get_h2(heading))
-            lines.extend(sorted(linkLines))
-            lines.append('\n')
 
-    def _new_zim_page(self, element, elemId):
-        """Return the reference to a new ZimPage subclass instance."""
+    def remove_link(self, elemId, pageName):
+        """Remove the link to the element's page; return True if removed."""
+        sectionLinks = self.links[elemId[:2]]
+        link = self._get_link(pageName)
+        if link not in sectionLinks:
+            return False
+
+        sectionLinks.remove(link)
+        return True
+
+    def write_links(self):
+        """Write the link sections into the existing book page file.
+
+        Only the link lines of the sections are replaced, and sections
+        are added or removed as needed. All other lines, including text
+        added in Zim, are kept as they are.
+        Return True if the book page file is written.
+        """
+        lines = self._read_lines()
+        text = '\n'.join(lines)
+        newText = '\n'.join(self._splice_links(lines))
+        if newText == text:
+            return False
+
+        return self.write(newText)
+
+    def _find_link_sections(self, lines):
+        """Return a dict with the positions of the link sections.
+
+        Positional arguments:
+            lines -- list of the page's text lines.
+
+        key: element ID prefix
+        value: tuple (index of the heading line, index after the section)
+        A section ends with the next heading, or with the page.
+        """
+        headings = {}
+        for prefix, heading in self.LINK_SECTIONS:
+            headings[self.get_h2(_(heading)).rstrip('\n')] = prefix
+        sections = {}
+        prefix = None
+        start = None
+        for i, line in enumerate(lines):
+            if not line.startswith('='):
+                continue
+
+            if prefix is not None:
+                sections[prefix] = (start, i)
+            prefix = headings.get(line.rstrip(), None)
+            if prefix in sections:
+                # Only the first section with the heading is updated.
+                prefix = None
+            start = i
+        if prefix is not None:
+            sections[prefix] = (start, len(lines))
+        return sections
+
+    def _get_descriptors(self):
+        """Generate the PageDescriptor instances of the linkable elements."""
+        for elements in (
+            self.element.characters,
+            self.element.locations,
+            self.element.items,
+        ):
+            for elemId in elements:
+                yield self._get_page_class(elemId).get_descriptor(
+                    elements[elemId],
+                    elemId,
+                )
+
+    def _get_link(self, pageName):
+        return f'[[{pageName}]]'
+
+    def _get_page_class(self, elemId):
+        """Return the ZimPage subclass for the element ID."""
 
         # WikiFactory cannot be used here due to circular import.
 
         if elemId.startswith(CHARACTER_PREFIX):
-            return CharacterPage(None, element)
+            return CharacterPage
 
         if elemId.startswith(LOCATION_PREFIX):
-            return WorldElementPage(None, element)
+            return WorldElementPage
 
         if elemId.startswith(ITEM_PREFIX):
-            return WorldElementPage(None, element)
+            return WorldElementPage
+
+    def _get_page_files(self, namespaces):
+        """Return a set with the paths of the files in the namespaces.
+
+        Positional arguments:
+            namespaces -- iterable of namespace tuples, as stored
+                          in the PageDescriptor instances.
+
+        The paths are relative to the home directory,
+        and normalized with os.path.normcase().
+        Each namespace directory is listed once.
+        """
+        homeDir = os.path.dirname(self.filePath)
+        pageFiles = set()
+        for namespace in namespaces:
+            relDir = '/'.join(namespace)
+            DIAGNOSTICS.count(DIAGNOSTICS.LIST)
+            try:
+                with os.scandir(f'{homeDir}/{relDir}') as entries:
+                    for entry in entries:
+                        if relDir:
+                            pageFiles.add(
+                                os.path.normcase(f'{relDir}/{entry.name}')
+                            )
+                        else:
+                            pageFiles.add(os.path.normcase(entry.name))
+            except OSError:
+                pass
+        return pageFiles
+
+    def _is_link_line(self, line):
+        """Return True if the line consists of a single link."""
+        return (
+            line.startswith('[[')
+            and line.endswith(']]')
+            and line.count('[[') == 1
+        )
+
+    def _read_lines(self):
+        """Return a list of the book page file's text lines."""
+        DIAGNOSTICS.count(DIAGNOSTICS.READ)
+        with open(self.filePath, 'r', encoding='utf-8') as f:
+            return f.read().split('\n')
+
+    def _splice_links(self, lines):
+        """Return the lines with the link sections replaced.
+
+        Positional arguments:
+            lines -- list of the page's text lines.
+
+        In an existing section, the link lines are replaced where
+        the first one was found; other lines are kept.
+        A missing section is inserted after the preceding link section,
+        or before the following one, or at the end of the page,
+        as it would be generated.
+        A section without links and other text is removed.
+        """
+        sections = self._find_link_sections(lines)
+        prefixes = [prefix for prefix, __ in self.LINK_SECTIONS]
+        edits = []
+        # tuples (start index, end index, section index, new lines)
+        for i, (prefix, heading) in enumerate(self.LINK_SECTIONS):
+            links = self.links[prefix]
+            if prefix in sections:
+                start, end = sections[prefix]
+                block = lines[start + 1:end]
+                keptLines = [
+                    line for line in block if not self._is_link_line(line)
+                ]
+                if not links and not any(line.strip() for line in keptLines):
+                    edits.append((start, end, i, []))
+                    continue
+
+                linkPosition = next(
+                    (
+                        j for j, line in enumerate(block)
+                        if self._is_link_line(line)
+                    ),
+                    None,
+                )
+                if linkPosition is None:
+                    if block[:1] == ['']:
+                        linkPosition = 1
+                    else:
+                        linkPosition = 0
+                edits.append((
+                    start,
+                    end,
+                    i,
+                    [lines[start]]
+                    + keptLines[:linkPosition]
+                    + links
+                    + keptLines[linkPosition:],
+                ))
+                continue
+
+            if not links:
+                continue
+
+            position = len(lines)
+            for previous in reversed(prefixes[:i]):
+                if previous in sections:
+                    position = sections[previous][1]
+                    break
+
+            else:
+                for following in prefixes[i + 1:]:
+                    if following in sections:
+                        position = sections[following][0]
+                        break
+
+            edits.append((
+                position,
+                position,
+                i,
+                [self.get_h2(_(heading)).rstrip('\n'), ''] + links + ['', ''],
+            ))
+
+        # Apply the edits bottom up, so that the positions remain valid.
+        lines = list(lines)
+        for start, end, __, newLines in sorted(edits, reverse=True):
+            lines[start:end] = newLines
+        return lines
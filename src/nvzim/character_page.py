@@ -10,45 +10,82 @@ from nvzim.world_element_page import WorldElementPage
 
 
 class CharacterPage(WorldElementPage):
+    __slots__ = ('field1Name', 'field2Name')
 
     def __init__(
         self,
         filePath,
         element,
-        field1Name=f'{_("Field")} 1',
-        field2Name=f'{_("Field")} 2',
+        field1Name=None,
+        field2Name=None,
     ):
         super().__init__(filePath, element)
+        if field1Name is None:
+            field1Name = f'{_("Field")} 1'
+        if field2Name is None:
+            field2Name = f'{_("Field")} 2'
         self.field1Name = field1Name
         self.field2Name = field2Name
-        self.page_names = [
-            self.element.fullName,
-            self.element.title,
-            self.element.aka,
+
+    def end(self):
+        """Parser callback method for the end of the note.
+        
+        Extends the superclass method.
+        """
+        lifeDates = self._get_life_dates()
+        if lifeDates:
+            self._remove_line(self._preamble, lifeDates)
+        super().end()
+        bioLines = self._sections.get(self.field1Name, [])
+        if lifeDates:
+            self._remove_line(bioLines, lifeDates)
+        self._import_text('bio', bioLines)
+        self._import_text('goals', self._sections.get(self.field2Name, []))
+
+    @classmethod
+    def get_page_names(cls, element):
+        """Return a list of page name candidates for the element.
+        
+        Overrides the superclass method.
+        """
+        return [
+            element.fullName,
+            element.title,
+            element.aka,
         ]
 
-    def fill_page(self, lines):
-        """Add page content to the lines.
+    def iter_content(self):
+        """Generate the page content lines.
         
         Extends the superclass method.
         """
-        super().fill_page(lines)
+        yield from super().iter_content()
 
+        lifeDates = self._get_life_dates()
         if self.element.bio:
-            lines.append(self.get_h2(self.field1Name))
-            self._write_life_dates(lines)
-            lines.append(self.element.bio)
-            lines.append('\n')
+            yield self.get_h2(self.field1Name)
+            if lifeDates:
+                yield lifeDates
+            yield self.link_names(self.element.bio)
+            yield '\n'
         else:
-            self._write_life_dates(lines)
-            lines.append('\n')
+            if lifeDates:
+                yield lifeDates
+            yield '\n'
 
         if self.element.goals:
-            lines.append(self.get_h2(self.field2Name))
-            lines.append(self.element.goals)
-            lines.append('\n')
+            yield self.get_h2(self.field2Name)
+            yield self.link_names(self.element.goals)
+            yield '\n'
 
-    def _write_life_dates(self, lines):
+    def _remove_line(self, lines, line):
+        """Remove the first occurrence of line from the lines, if any."""
+        line = line.rstrip('\n')
+        if line in lines:
+            lines.remove(line)
+
+    def _get_life_dates(self):
+        """Return the life dates line, or None if no date is known."""
         showDate = False
         if self.element.birthDate:
             startDate = locale_date(self.element.birthDate)
@@ -61,5 +98,4 @@ class CharacterPage(WorldElementPage):
         else:
             endDate = '?'
         if showDate:
-            lines.append(f'{startDate}—{endDate}\n')
-
+            return f'{startDate}—{endDate}\n'
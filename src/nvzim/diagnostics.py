@@ -0,0 +1,205 @@
+"""Provide a class for optional timing and file access statistics.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from contextlib import contextmanager
+from functools import wraps
+import os
+import threading
+import time
+
+
+class Diagnostics:
+    """Record wall times and file access counts, if enabled.
+
+    Operations are measured with the measure() context manager
+    or the timed() decorator. The file accesses are counted where
+    they happen. While disabled, the overhead is a single flag check.
+    Each thread increments its own counters without locking;
+    they are added up under the lock when read.
+    While enabled, each measured operation is logged with its
+    counter increments to a rotating log file.
+    """
+    LOG_PATH = '~/.novx/logs/nv_zim_diagnostics.log'
+    MAX_BYTES = 1000000
+    BACKUP_COUNT = 3
+
+    STAT = 'stat'
+    LIST = 'list'
+    READ = 'read'
+    WRITE = 'write'
+    BYTES_WRITTEN = 'bytes written'
+    SPAWN = 'spawn'
+    COUNTERS = (STAT, LIST, READ, WRITE, BYTES_WRITTEN, SPAWN)
+
+    def __init__(self):
+        self.enabled = False
+        self.logPath = os.path.expanduser(self.LOG_PATH)
+        self.timings = {}
+        # key: operation name
+        # value: [number of calls, total seconds, maximum seconds]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # the "counters" attribute holds the current thread's counters
+        self._threadCounters = []
+        # (thread, counters) tuples of the threads that have counted
+        self._finishedCounters = dict.fromkeys(self.COUNTERS, 0)
+        # sum of the counters of the threads that have ended
+        self._logger = None
+        self._handler = None
+
+    def count(self, counter, amount=1):
+        """Increment a counter, if enabled."""
+        if not self.enabled:
+            return
+
+        try:
+            counters = self._local.counters
+        except AttributeError:
+            counters = self._add_thread_counters()
+        counters[counter] += amount
+        # Only the current thread changes its counters.
+
+    def disable(self):
+        """Stop recording, and close the log file."""
+        self.enabled = False
+        if self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    def enable(self):
+        """Start recording, logging to the rotating log file.
+
+        Raise OSError if the log directory cannot be created.
+        """
+        if self.enabled:
+            return
+
+        import logging
+        from logging.handlers import RotatingFileHandler
+        # deferred, because diagnostics are rarely enabled
+
+        if self._logger is None:
+            self._logger = logging.getLogger('nvzim.diagnostics')
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+        os.makedirs(os.path.dirname(self.logPath), exist_ok=True)
+        self._handler = RotatingFileHandler(
+            self.logPath,
+            maxBytes=self.MAX_BYTES,
+            backupCount=self.BACKUP_COUNT,
+            encoding='utf-8',
+        )
+        self._handler.setFormatter(
+            logging.Formatter('%(asctime)s %(message)s')
+        )
+        self._logger.addHandler(self._handler)
+        self.enabled = True
+
+    def get_summary(self):
+        """Return a list of text lines summarizing the records."""
+        with self._lock:
+            counters = self._get_counters()
+            lines = []
+            for name in sorted(self.timings):
+                calls, total, maximum = self.timings[name]
+                lines.append(
+                    (
+                        f'{name}: {calls} x, '
+                        f'{total * 1000:.1f} ms total, '
+                        f'{maximum * 1000:.1f} ms max'
+                    )
+                )
+            if lines:
+                lines.append('')
+            for counter in self.COUNTERS:
+                lines.append(f'{counter}: {counters[counter]}')
+        return lines
+
+    @contextmanager
+    def measure(self, name):
+        """Context manager recording the wall time of an operation."""
+        if not self.enabled:
+            yield
+            return
+
+        with self._lock:
+            startCounters = self._get_counters()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                counters = self._get_counters()
+                timing = self.timings.setdefault(name, [0, 0.0, 0.0])
+                timing[0] += 1
+                timing[1] += elapsed
+                timing[2] = max(timing[2], elapsed)
+                increments = ' '.join(
+                    f'{counter.replace(" ", "_")}='
+                    f'{counters[counter] - startCounters[counter]}'
+                    for counter in self.COUNTERS
+                )
+            self._logger.info(f'{name} {elapsed * 1000:.1f} ms {increments}')
+
+    def reset(self):
+        """Clear the records."""
+        with self._lock:
+            self._local = threading.local()
+            self._threadCounters = []
+            self._finishedCounters = dict.fromkeys(self.COUNTERS, 0)
+            self.timings = {}
+
+    def timed(self, name):
+        """Return a decorator recording the wall time of a function."""
+
+        def decorator(function):
+
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+
+                with self.measure(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _add_thread_counters(self):
+        """Return new counters for the current thread."""
+        counters = dict.fromkeys(self.COUNTERS, 0)
+        self._local.counters = counters
+        with self._lock:
+            self._threadCounters.append((threading.current_thread(), counters))
+        return counters
+
+    def _get_counters(self):
+        """Return a dict with the sums of all threads' counters.
+
+        The counters of the threads that have ended are merged,
+        so the list does not grow with every writer thread.
+        Call this with the lock held.
+        """
+        totals = self._finishedCounters
+        threadCounters = []
+        for thread, counters in self._threadCounters:
+            if thread.is_alive():
+                threadCounters.append((thread, counters))
+            else:
+                for counter in self.COUNTERS:
+                    totals[counter] += counters[counter]
+        self._threadCounters = threadCounters
+        totals = dict(totals)
+        for __, counters in threadCounters:
+            for counter in self.COUNTERS:
+                totals[counter] += counters[counter]
+        return totals
+
+
+DIAGNOSTICS = Diagnostics()
@@ -0,0 +1,154 @@
+"""Provide a class for coalescing Zim notebook index updates.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import subprocess
+
+from nvzim.diagnostics import DIAGNOSTICS
+
+
+class IndexScheduler:
+    """Run Zim's indexer for a notebook, one process at a time.
+
+    Requests are debounced, and requests arriving while the indexer
+    is running are merged into the next run. If the changed pages
+    are known, only these pages are indexed; Zim's "--index" command
+    takes an optional page argument.
+
+    Scheduling requires a Tk widget for the timers. Without one,
+    a request starts the indexer at once, unless it is running;
+    then the request is deferred until the next one.
+    """
+    DELAY = 500
+    # milliseconds to wait for further requests
+    POLL_INTERVAL = 250
+    # milliseconds between checks for the indexer's termination
+    MAX_PAGES = 20
+    # above this number of pending pages, the whole notebook is indexed
+
+    def __init__(self, zimApp, notebookPath, tkRoot=None, on_done=None):
+        """Set up an idle scheduler.
+
+        Positional arguments:
+            zimApp: str -- Path to the Zim executable.
+            notebookPath: str -- Path to the notebook file.
+
+        Optional arguments:
+            tkRoot -- Tk widget providing the after() timer methods.
+            on_done -- callback function taking two arguments:
+                       success: bool, message: str.
+        """
+        self.zimApp = zimApp
+        self.notebookPath = notebookPath
+        self.tkRoot = tkRoot
+        self.on_done = on_done
+        self._process = None
+        self._processPage = None
+        self._timerId = None
+        self._isFullIndexPending = False
+        self._pendingPages = []
+
+    def cancel(self):
+        """Discard pending requests; let a running indexer finish."""
+        self._isFullIndexPending = False
+        self._pendingPages.clear()
+        self._stop_timer()
+
+    def is_running(self):
+        """Return True if an indexer process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def request(self, pages=None):
+        """Request an index update.
+
+        Optional arguments:
+            pages -- list of Zim page names; if None, index all pages.
+        """
+        if pages is None:
+            self._isFullIndexPending = True
+        else:
+            for page in pages:
+                if page not in self._pendingPages:
+                    self._pendingPages.append(page)
+        if self.tkRoot is None:
+            if not self.is_running():
+                self._start_next()
+            return
+
+        self._stop_timer()
+        self._timerId = self.tkRoot.after(self.DELAY, self._on_timer)
+
+    def _finish(self):
+        """Report the result of the terminated indexer process."""
+        returnCode = self._process.returncode
+        page = self._processPage
+        self._process = None
+        self._processPage = None
+        if returnCode == 0:
+            if not self._isFullIndexPending and not self._pendingPages:
+                self._report(True, '')
+            return
+
+        if page is not None:
+            # Maybe the page is unknown to Zim; try the whole notebook.
+            self._isFullIndexPending = True
+            return
+
+        self._report(False, f'exit code {returnCode}')
+
+    def _on_timer(self):
+        self._timerId = None
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._timerId = self.tkRoot.after(
+                    self.POLL_INTERVAL,
+                    self._on_timer,
+                )
+                return
+
+            self._finish()
+        self._start_next()
+
+    def _report(self, success, message):
+        if self.on_done is not None:
+            self.on_done(success, message)
+
+    def _start_next(self):
+        """Start the indexer for the pending requests, if any."""
+        if self._process is not None:
+            self._finish()
+        command = [
+            self.zimApp,
+            '--index',
+            self.notebookPath,
+        ]
+        if self._isFullIndexPending or len(self._pendingPages) > self.MAX_PAGES:
+            self._isFullIndexPending = False
+            self._pendingPages.clear()
+        elif self._pendingPages:
+            self._processPage = self._pendingPages.pop(0)
+            command.append(self._processPage)
+        else:
+            return
+
+        try:
+            self._process = subprocess.Popen(command)
+        except OSError as ex:
+            self._processPage = None
+            self._report(False, str(ex))
+            return
+
+        DIAGNOSTICS.count(DIAGNOSTICS.SPAWN)
+
+        if self.tkRoot is not None:
+            self._timerId = self.tkRoot.after(
+                self.POLL_INTERVAL,
+                self._on_timer,
+            )
+
+    def _stop_timer(self):
+        if self._timerId is not None:
+            self.tkRoot.after_cancel(self._timerId)
+            self._timerId = None
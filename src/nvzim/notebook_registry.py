@@ -0,0 +1,108 @@
+"""Provide a class for a registry of known Zim notebook locations.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import os
+
+from nvzim.diagnostics import DIAGNOSTICS
+from nvzim.zim_notebook import ZimNotebook
+
+
+class NotebookRegistry:
+    """Find the notebook a page file belongs to, caching the results.
+
+    The directories are checked from the page upwards, so that
+    the innermost notebook is found, even if it is nested in another one.
+    Known notebook directories need no directory listing.
+    Directories without notebook are remembered with their
+    modification time; they are listed again only if changed.
+    All paths are stored with forward slashes.
+    """
+
+    def __init__(self):
+        self._notebooks = {}
+        # key: notebook directory path
+        # value: notebook file path
+        self._noNotebook = {}
+        # key: directory path
+        # value: modification time when found without notebook
+
+    def add_notebook(self, notebookPath):
+        """Register a notebook file."""
+        notebookPath = self._norm_path(notebookPath)
+        dirPath = os.path.dirname(notebookPath)
+        self._notebooks[dirPath] = notebookPath
+        self._noNotebook.pop(dirPath, None)
+
+    def find_notebook(self, pagePath):
+        """Return a tuple: notebook file path, Zim page name.
+
+        Positional arguments:
+            pagePath: str -- Page file path without extension.
+                             The path separators may be forward slashes
+                             or those of the operating system.
+
+        Return (None, None) if the page does not belong to a notebook.
+        """
+        # Search backwards through the file branch.
+        pageNames = self._norm_path(pagePath).split('/')
+        zimPages = []
+        while pageNames:
+            zimPages.insert(0, pageNames.pop())
+            notebookPath = self._check_dir('/'.join(pageNames))
+            if notebookPath is not None:
+                return notebookPath, ':'.join(zimPages)
+
+        return None, None
+
+    def invalidate(self):
+        """Forget all results."""
+        self._notebooks.clear()
+        self._noNotebook.clear()
+
+    def _check_dir(self, dirPath):
+        """Return the path of the notebook in the directory, if any."""
+        notebookPath = self._notebooks.get(dirPath, None)
+        if notebookPath is not None:
+            DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+            if os.path.isfile(notebookPath):
+                return notebookPath
+
+            del self._notebooks[dirPath]
+
+        DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+        try:
+            mtime = os.stat(f'{dirPath}/').st_mtime_ns
+        except OSError:
+            return None
+
+        if self._noNotebook.get(dirPath, None) == mtime:
+            return None
+
+        notebookFiles = []
+        DIAGNOSTICS.count(DIAGNOSTICS.LIST)
+        try:
+            with os.scandir(f'{dirPath}/') as entries:
+                for entry in entries:
+                    if (
+                        entry.name.endswith(ZimNotebook.EXTENSION)
+                        and not entry.name.startswith('.')
+                        and entry.is_file()
+                    ):
+                        notebookFiles.append(entry.name)
+        except OSError:
+            return None
+
+        if not notebookFiles:
+            self._noNotebook[dirPath] = mtime
+            return None
+
+        notebookPath = f'{dirPath}/{min(notebookFiles)}'
+        self.add_notebook(notebookPath)
+        return notebookPath
+
+    def _norm_path(self, path):
+        """Return path with forward slashes as separators."""
+        return os.path.normpath(path).replace(os.sep, '/')
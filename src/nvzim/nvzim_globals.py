@@ -10,6 +10,18 @@ ZIM_NOTEBOOK_ABS_TAG = 'zim-notebook-abs'
 ZIM_NOTEBOOK_REL_TAG = 'zim-notebook-rel'
 ZIM_PAGE_ABS_TAG = 'zim-page-abs'
 ZIM_PAGE_REL_TAG = 'zim-page-rel'
+ZIM_LAYOUT_TAG = 'zim-layout'
+ZIM_AUTOLINK_TAG = 'zim-autolink'
+
+LAYOUT_FLAT = 'flat'
+# all element pages in the home directory
+LAYOUT_NAMESPACES = 'namespaces'
+# element pages in a namespace per element type
+LAYOUT_SHARDED = 'sharded'
+# element pages in a namespace per element type and initial
+
+TAG_NAMESPACE = 'Tags'
+# namespace of the tag pages, and name of the tag overview page
 
 
 class StopParsing(Exception):
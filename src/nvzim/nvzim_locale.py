@@ -1,5 +1,8 @@
 """Locale settings for nv_zim.
 
+The message catalog is loaded on the first translation,
+so that importing the nvzim modules does no locale file I/O.
+
 Copyright (c) 2025 Peter Triesberger
 For further information see https://github.com/peter88213/nv_zim
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
@@ -9,22 +12,92 @@ import locale
 import os
 import sys
 
-# Initialize localization.
-LOCALE_PATH = f'{os.path.dirname(sys.argv[0])}/locale/'
-try:
-    CURRENT_LANGUAGE = locale.getlocale()[0][:2]
-except:
-    # Fallback for old Windows versions.
-    CURRENT_LANGUAGE = locale.getdefaultlocale()[0][:2]
-try:
-    t = gettext.translation(
-        'nv_zim',
-        LOCALE_PATH,
-        languages=[CURRENT_LANGUAGE],
-    )
-    _ = t.gettext
-except:
-
-    def _(message):
-        return message
+_gettext = None
+# translation function of the message catalog, once loaded
+
+
+def _(message):
+    """Return the translated message."""
+    if _gettext is None:
+        _load_catalog()
+    return _gettext(message)
+
+
+def N_(message):
+    """Return message unchanged, marking it for translation.
+
+    Use this where the message is evaluated at import time,
+    e.g. for class attributes, and translate it with _() where used.
+    """
+    return message
+
+
+def lazy_(message):
+    """Return a LazyString for message.
+
+    Use this instead of N_() where the translated message
+    is to be used as a string.
+    """
+    return LazyString(message)
+
+
+class LazyString:
+    """A message that is translated when it is used as a string.
+
+    The translation is cached, because the language
+    does not change while the application is running.
+    """
+    __slots__ = ('message', 'suffix', '_text')
+
+    def __init__(self, message, suffix=''):
+        """Positional arguments:
+            message: str -- Message to be translated.
+
+        Optional arguments:
+            suffix: str -- Text appended to the translation.
+        """
+        self.message = message
+        self.suffix = suffix
+        self._text = None
+
+    def __add__(self, other):
+        return LazyString(self.message, f'{self.suffix}{other}')
+
+    def __eq__(self, other):
+        if isinstance(other, LazyString):
+            other = str(other)
+        return str(self) == other
+
+    def __format__(self, formatSpec):
+        return format(str(self), formatSpec)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.message!r}, {self.suffix!r})'
+
+    def __str__(self):
+        if self._text is None:
+            self._text = f'{_(self.message)}{self.suffix}'
+        return self._text
+
 
+def _load_catalog():
+    """Set the translation function, falling back to no translation."""
+    global _gettext
+    localePath = f'{os.path.dirname(sys.argv[0])}/locale/'
+    try:
+        currentLanguage = locale.getlocale()[0][:2]
+    except:
+        # Fallback for old Windows versions.
+        currentLanguage = locale.getdefaultlocale()[0][:2]
+    try:
+        t = gettext.translation(
+            'nv_zim',
+            localePath,
+            languages=[currentLanguage],
+        )
+        _gettext = t.gettext
+    except:
+        _gettext = str
@@ -0,0 +1,31 @@
+"""Provide a lightweight descriptor for an element's wiki page.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from collections import namedtuple
+
+
+class PageDescriptor(
+    namedtuple(
+        'PageDescriptor',
+        'elemId pageClass pageNames pageName fileName namespace',
+    )
+):
+    # elemId: ID of the element the page belongs to.
+    # pageClass: ZimPage subclass for the element's page.
+    # pageNames: tuple of the page name candidates, possibly None.
+    # pageName: valid page name as returned by new_page_name(), or None.
+    # fileName: page file name, or None.
+    # namespace: tuple of the namespaces below the home namespace
+    #            the page belongs to; empty for a page in the home directory.
+    __slots__ = ()
+
+    def get_link(self):
+        """Return the page link target, relative to the home namespace."""
+        return ':'.join(self.namespace + (self.pageName,))
+
+    def get_rel_path(self):
+        """Return the page file path, relative to the home directory."""
+        return '/'.join(self.namespace + (self.fileName,))
@@ -0,0 +1,239 @@
+"""Provide a class for a persistent Zim notebook page name index.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from bisect import insort
+import json
+import os
+
+from nvzim.diagnostics import DIAGNOSTICS
+from nvzim.zim_page import ZimPage
+
+
+class PageIndex:
+    """Map normalized page names to page file paths.
+
+    The index covers a notebook's home directory tree.
+    For each directory, the modification time, the page names
+    and the subdirectories are stored, so that only directories
+    whose modification time has changed are listed again.
+    """
+    FILENAME = '.nv_zim_index.json'
+    VERSION = 1
+
+    def __init__(self, homeDir, filePath):
+        """Set up an empty index.
+
+        Positional arguments:
+            homeDir: str -- Path to the directory tree to be indexed.
+            filePath: str -- Path to the file where the index is kept.
+        """
+        self.homeDir = homeDir
+        self.filePath = filePath
+        self._dirs = {}
+        # key: directory path relative to homeDir
+        # value: [modification time, list of page file names, list of subdirs]
+        self._pages = {}
+        # key: normalized page name
+        # value: page file path relative to homeDir
+        self._isLoaded = False
+
+    def get_path(self, pageName, refresh=True):
+        """Return the path of the page specified by pageName, or None.
+
+        Positional arguments:
+            pageName: str -- Page name, not case sensitive.
+
+        Optional arguments:
+            refresh: bool -- If True, refresh the index,
+                             if the page is not found.
+        """
+        if not self._isLoaded:
+            self.load()
+            self.refresh()
+        filePath = self._get_indexed_path(pageName)
+        if filePath is not None:
+            DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+            if os.path.isfile(filePath):
+                return filePath
+
+        if refresh and self.refresh():
+            return self._get_indexed_path(pageName)
+
+    def get_mtime(self):
+        """Return the newest modification time of the home tree in ns.
+
+        The directories known to the index are statted, but not listed.
+        A new or removed directory changes its parent's modification
+        time, so the known directories are enough.
+        Only an empty index is refreshed first.
+        """
+        if not self._isLoaded:
+            self.load()
+        if not self._dirs:
+            self.refresh()
+        newestMtime = 0
+        for relDir in self._dirs:
+            DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+            try:
+                mtime = os.stat(self._get_abs_path(relDir)).st_mtime_ns
+            except OSError:
+                continue
+
+            newestMtime = max(newestMtime, mtime)
+        return newestMtime
+
+    def load(self):
+        """Read the index file, if any."""
+        self._isLoaded = True
+        try:
+            with open(self.filePath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION:
+                return
+
+            self._dirs = data['dirs']
+        except (OSError, ValueError, KeyError, AttributeError):
+            self._dirs = {}
+        self._build_name_map()
+
+    @staticmethod
+    def normalize(pageName):
+        """Return pageName as an index key."""
+        return pageName.replace('_', ' ').casefold()
+
+    def refresh(self):
+        """Rescan the directories that have changed since the last scan.
+
+        Return True if the index has changed.
+        """
+        if not self._isLoaded:
+            self.load()
+        isChanged = False
+        visited = set()
+        pending = ['']
+        while pending:
+            relDir = pending.pop()
+            visited.add(relDir)
+            absDir = self._get_abs_path(relDir)
+            DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+            try:
+                mtime = os.stat(absDir).st_mtime_ns
+            except OSError:
+                continue
+
+            entry = self._dirs.get(relDir, None)
+            if entry is None or entry[0] != mtime:
+                entry = self._scan_dir(absDir, mtime)
+                self._dirs[relDir] = entry
+                isChanged = True
+            for subDir in entry[2]:
+                pending.append(self._get_rel_path(relDir, subDir))
+        for relDir in set(self._dirs) - visited:
+            del self._dirs[relDir]
+            isChanged = True
+        if isChanged:
+            self._build_name_map()
+            self.save()
+        return isChanged
+
+    def save(self):
+        """Write the index file, if possible."""
+        data = {
+            'version': self.VERSION,
+            'dirs': self._dirs,
+        }
+        tempPath = f'{self.filePath}.tmp'
+        try:
+            with open(tempPath, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tempPath, self.filePath)
+        except OSError:
+            # The index is rebuilt on the next start.
+            pass
+
+    def update_pages(self, created, deleted):
+        """Add created and remove deleted page files without scanning.
+
+        Positional arguments:
+            created -- iterable of created page file paths.
+            deleted -- iterable of deleted page file paths.
+
+        Only directories already in the index are updated.
+        Their modification times are kept, so they are listed again
+        on the next refresh.
+        """
+        if not self._isLoaded:
+            return
+
+        isChanged = False
+        for filePaths, isCreated in ((deleted, False), (created, True)):
+            for filePath in filePaths:
+                if not filePath.startswith(f'{self.homeDir}/'):
+                    continue
+
+                relDir, fileName = os.path.split(
+                    filePath[len(self.homeDir) + 1:]
+                )
+                entry = self._dirs.get(relDir, None)
+                if entry is None:
+                    continue
+
+                pageFiles = entry[1]
+                if isCreated and fileName not in pageFiles:
+                    insort(pageFiles, fileName)
+                    isChanged = True
+                elif not isCreated and fileName in pageFiles:
+                    pageFiles.remove(fileName)
+                    isChanged = True
+        if isChanged:
+            self._build_name_map()
+
+    def _build_name_map(self):
+        # Pages in upper directories take precedence.
+        self._pages = {}
+        relDirs = sorted(self._dirs, key=lambda d: (d.count('/'), d))
+        for relDir in relDirs:
+            for fileName in self._dirs[relDir][1]:
+                pageName = fileName[:-len(ZimPage.EXTENSION)]
+                self._pages.setdefault(
+                    self.normalize(pageName),
+                    self._get_rel_path(relDir, fileName),
+                )
+
+    def _get_abs_path(self, relPath):
+        if relPath:
+            return f'{self.homeDir}/{relPath}'
+
+        return self.homeDir
+
+    def _get_indexed_path(self, pageName):
+        relPath = self._pages.get(self.normalize(pageName), None)
+        if relPath is not None:
+            return self._get_abs_path(relPath)
+
+    def _get_rel_path(self, relDir, name):
+        if relDir:
+            return f'{relDir}/{name}'
+
+        return name
+
+    def _scan_dir(self, absDir, mtime):
+        pageFiles = []
+        subDirs = []
+        DIAGNOSTICS.count(DIAGNOSTICS.LIST)
+        try:
+            with os.scandir(absDir) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+
+                    if entry.is_dir():
+                        subDirs.append(entry.name)
+                    elif entry.name.endswith(ZimPage.EXTENSION):
+                        pageFiles.append(entry.name)
+        except OSError:
+            pass
+        return [mtime, sorted(pageFiles), sorted(subDirs)]
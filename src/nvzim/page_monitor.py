@@ -0,0 +1,333 @@
+"""Provide a class for monitoring the page files of a Zim notebook.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+
+from nvzim.zim_page import ZimPage
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class PageMonitor:
+    """Report the page files created or deleted in a directory tree.
+
+    The tree is watched by a background thread that keeps its own
+    snapshot of the directories. On Linux, inotify tells which
+    directories have changed; elsewhere, the directories' modification
+    times are polled. The changes are passed through a queue that is
+    read by a Tk timer, so the callback runs in the main thread.
+    """
+    QUEUE_INTERVAL = 500
+    # milliseconds between checks of the change queue
+    SCAN_INTERVAL = 2.0
+    # seconds between two polls, if inotify is not available
+    WAIT_TIMEOUT = 0.5
+    # seconds to wait for inotify events before checking for stop
+
+    def __init__(self, homeDir, tkRoot, on_change):
+        """Set up a stopped monitor.
+
+        Positional arguments:
+            homeDir: str -- Path to the directory tree to be watched.
+            tkRoot -- Tk widget providing the after() timer methods.
+            on_change -- callback function taking two arguments:
+                         created: set, deleted: set of page file paths.
+
+        After the initial scan, on_change is called with empty sets.
+        """
+        self.homeDir = homeDir
+        self.tkRoot = tkRoot
+        self.on_change = on_change
+        self.pages = None
+        # set of the existing page file paths, known after the initial scan
+        self._queue = queue.Queue()
+        self._stopEvent = threading.Event()
+        self._thread = None
+        self._timerId = None
+
+        # The following is accessed by the monitor thread only.
+        self._dirs = {}
+        # key: directory path relative to homeDir
+        # value: (modification time, set of page file names, set of subdirs)
+        self._libc = None
+        self._fd = None
+        self._watches = {}
+        # key: inotify watch descriptor
+        # value: directory path relative to homeDir
+
+    def start(self):
+        """Start watching the directory tree."""
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._timerId = self.tkRoot.after(
+            self.QUEUE_INTERVAL,
+            self._check_queue,
+        )
+
+    def stop(self):
+        """Stop watching; the thread terminates in the background."""
+        self._stopEvent.set()
+        if self._timerId is not None:
+            self.tkRoot.after_cancel(self._timerId)
+            self._timerId = None
+
+    def _add_watch(self, relDir):
+        wd = self._libc.inotify_add_watch(
+            self._fd,
+            os.fsencode(self._get_abs_path(relDir)),
+            WATCH_MASK,
+        )
+        if wd >= 0:
+            self._watches[wd] = relDir
+
+    def _check_queue(self):
+        """Pass the queued changes to the callback function."""
+        self._timerId = None
+        created = set()
+        deleted = set()
+        isChanged = False
+        while True:
+            try:
+                newPages, oldPages = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            isChanged = True
+            if self.pages is None:
+                # The first item is the initial scan.
+                self.pages = set(newPages)
+                continue
+
+            for filePath in oldPages:
+                if filePath in created:
+                    created.remove(filePath)
+                else:
+                    deleted.add(filePath)
+                self.pages.discard(filePath)
+            for filePath in newPages:
+                if filePath in deleted:
+                    deleted.remove(filePath)
+                else:
+                    created.add(filePath)
+                self.pages.add(filePath)
+        if self._stopEvent.is_set():
+            return
+
+        if isChanged:
+            self.on_change(created, deleted)
+        self._timerId = self.tkRoot.after(
+            self.QUEUE_INTERVAL,
+            self._check_queue,
+        )
+
+    def _forget(self, relDir, deleted):
+        """Remove a directory and its subdirectories from the snapshot."""
+        for knownDir in list(self._dirs):
+            if (
+                relDir
+                and knownDir != relDir
+                and not knownDir.startswith(f'{relDir}/')
+            ):
+                continue
+
+            for fileName in self._dirs.pop(knownDir)[1]:
+                deleted.append(self._get_abs_path(knownDir, fileName))
+            for wd in list(self._watches):
+                if self._watches[wd] == knownDir:
+                    self._libc.inotify_rm_watch(self._fd, wd)
+                    del self._watches[wd]
+
+    def _get_abs_path(self, relDir, fileName=None):
+        absPath = self.homeDir
+        if relDir:
+            absPath = f'{absPath}/{relDir}'
+        if fileName is not None:
+            absPath = f'{absPath}/{fileName}'
+        return absPath
+
+    def _join(self, relDir, name):
+        if relDir:
+            return f'{relDir}/{name}'
+
+        return name
+
+    def _open_inotify(self):
+        """Return True if an inotify instance is created."""
+        if not sys.platform.startswith('linux'):
+            return False
+
+        import ctypes
+        # deferred, because it is needed on Linux only
+
+        try:
+            self._libc = ctypes.CDLL(None, use_errno=True)
+            # The C library is linked to the Python interpreter.
+            fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+
+        if fd < 0:
+            return False
+
+        self._fd = fd
+        return True
+
+    def _poll(self):
+        while not self._stopEvent.wait(self.SCAN_INTERVAL):
+            self._post(*self._update('', True))
+
+    def _post(self, created, deleted):
+        if created or deleted:
+            self._queue.put((created, deleted))
+
+    def _read_events(self):
+        """Return the set of directories with inotify events, or None.
+
+        None means that events have been lost.
+        """
+        data = os.read(self._fd, 65536)
+        relDirs = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, __, nameLength = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + nameLength].rstrip(b'\0')
+            offset += nameLength
+            if mask & IN_Q_OVERFLOW:
+                return None
+
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            if name.startswith(b'.'):
+                continue
+
+            if mask & IN_ISDIR or name.endswith(ZimPage.EXTENSION.encode()):
+                relDir = self._watches.get(wd, None)
+                if relDir is not None:
+                    relDirs.add(relDir)
+        return relDirs
+
+    def _run(self):
+        try:
+            isWatching = self._open_inotify()
+            created, __ = self._update('', True)
+            self._queue.put((created, []))
+            if isWatching and self._watches:
+                self._watch()
+            else:
+                self._poll()
+        except OSError:
+            pass
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+
+    def _scan_dir(self, absDir):
+        pageFiles = set()
+        subDirs = set()
+        with os.scandir(absDir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+
+                if entry.is_dir():
+                    subDirs.add(entry.name)
+                elif entry.name.endswith(ZimPage.EXTENSION):
+                    pageFiles.add(entry.name)
+        return pageFiles, subDirs
+
+    def _update(self, startDir, isPolling):
+        """Update the snapshot, starting at a directory.
+
+        Positional arguments:
+            startDir: str -- Directory path relative to homeDir.
+            isPolling: bool -- If True, check the whole subtree;
+                               otherwise, scan the start directory
+                               and its new subdirectories only.
+
+        Return a tuple: list of created, list of deleted page file paths.
+        """
+        created = []
+        deleted = []
+        pending = [startDir]
+        while pending:
+            relDir = pending.pop()
+            absDir = self._get_abs_path(relDir)
+            entry = self._dirs.get(relDir, None)
+            try:
+                mtime = os.stat(absDir).st_mtime_ns
+                if (
+                    entry is not None
+                    and entry[0] == mtime
+                    and (isPolling or relDir != startDir)
+                ):
+                    if isPolling:
+                        for subDir in entry[2]:
+                            pending.append(self._join(relDir, subDir))
+                    continue
+
+                if entry is None and self._fd is not None:
+                    self._add_watch(relDir)
+                pageFiles, subDirs = self._scan_dir(absDir)
+            except OSError:
+                self._forget(relDir, deleted)
+                continue
+
+            if entry is None:
+                oldPages = set()
+                oldDirs = set()
+            else:
+                __, oldPages, oldDirs = entry
+            for fileName in pageFiles - oldPages:
+                created.append(self._get_abs_path(relDir, fileName))
+            for fileName in oldPages - pageFiles:
+                deleted.append(self._get_abs_path(relDir, fileName))
+            for subDir in oldDirs - subDirs:
+                self._forget(self._join(relDir, subDir), deleted)
+            self._dirs[relDir] = (mtime, pageFiles, subDirs)
+            for subDir in subDirs:
+                subDir = self._join(relDir, subDir)
+                if isPolling or subDir not in self._dirs:
+                    pending.append(subDir)
+        return created, deleted
+
+    def _watch(self):
+        while not self._stopEvent.is_set():
+            ready, __, __ = select.select([self._fd], [], [], self.WAIT_TIMEOUT)
+            if not ready:
+                continue
+
+            relDirs = self._read_events()
+            if relDirs is None:
+                self._post(*self._update('', True))
+                continue
+
+            created = []
+            deleted = []
+            for relDir in relDirs:
+                newPages, oldPages = self._update(relDir, False)
+                created.extend(newPages)
+                deleted.extend(oldPages)
+            self._post(created, deleted)
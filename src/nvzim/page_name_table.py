@@ -0,0 +1,240 @@
+"""Provide a class for allocating unique page names to the novel's elements.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from nvlib.novx_globals import CHARACTER_PREFIX
+from nvlib.novx_globals import CH_ROOT
+from nvlib.novx_globals import ITEM_PREFIX
+from nvlib.novx_globals import LOCATION_PREFIX
+from nvzim.nvzim_globals import LAYOUT_FLAT
+from nvzim.nvzim_globals import LAYOUT_NAMESPACES
+from nvzim.nvzim_globals import LAYOUT_SHARDED
+from nvzim.nvzim_globals import TAG_NAMESPACE
+from nvzim.nvzim_globals import ZIM_LAYOUT_TAG
+from nvzim.page_index import PageIndex
+
+
+class PageNameTable:
+    """Allocate a unique project wiki page name to each element.
+
+    Page names are compared the way Zim compares them, i.e. not case
+    sensitive, and with underscores as spaces. Elements whose pages
+    would get the same name form a group. The first element of a group
+    in the novel's order gets the page name; the others get their
+    element ID appended, e.g. "Alice (cr12)". The book page comes first.
+    Reserved page names, e.g. that of the tag overview page,
+    are given to no element.
+
+    The table is refreshed incrementally: only the groups of elements
+    that have been added, renamed, or deleted are allocated again,
+    so the result is the same as if the table were built anew.
+
+    The page layout is read from the novel's ZIM_LAYOUT_TAG field.
+    With a namespaced layout, the element pages are placed in a
+    namespace per element type, optionally sharded by initial.
+    The namespace names are not translated, so that the pages
+    stay in place when the user interface language changes.
+    """
+    TYPE_NAMESPACES = {
+        CHARACTER_PREFIX: 'Characters',
+        LOCATION_PREFIX: 'Locations',
+        ITEM_PREFIX: 'Items',
+    }
+    OTHER_INITIALS = 'Other'
+    # shard for page names not starting with a letter or digit
+    RESERVED_NAMES = frozenset((PageIndex.normalize(TAG_NAMESPACE),))
+    # normalized names of the pages that are not element pages
+
+    def __init__(self, model, wikiFactory):
+        self._mdl = model
+        self._wikiFactory = wikiFactory
+        self._novel = None
+        # the novel the table is built for
+        self._candidates = {}
+        # key: element ID
+        # value: PageDescriptor with the element's own page name
+        self._descriptors = {}
+        # key: element ID
+        # value: PageDescriptor with the allocated page name
+        self._groups = {}
+        # key: normalized page name
+        # value: list of the IDs of the elements claiming the page name
+        self._order = {}
+        # key: element ID
+        # value: sort key for the element's precedence within its group
+        self._layout = LAYOUT_FLAT
+
+    def get_collisions(self):
+        """Return a list of (page name, element IDs) tuples.
+
+        Each tuple stands for a page name claimed by several elements,
+        or reserved. The element IDs are in the novel's order.
+        """
+        collisions = []
+        for key, group in self._groups.items():
+            if len(group) > 1 or (group and key in self.RESERVED_NAMES):
+                elemIds = sorted(group, key=self._order.get)
+                collisions.append(
+                    (self._candidates[elemIds[0]].pageName, elemIds)
+                )
+        collisions.sort(key=lambda collision: self._order[collision[1][0]])
+        return collisions
+
+    def get_descriptor(self, elemId):
+        """Return the element's PageDescriptor with its allocated name.
+
+        Refresh the table, if the element is unknown.
+        Return None if the element has no wiki page.
+        """
+        if elemId not in self._descriptors:
+            self.refresh()
+        return self._descriptors.get(elemId, None)
+
+    def get_descriptors(self):
+        """Return a list of the elements' PageDescriptor instances.
+        
+        The list comprises all characters, locations, and items,
+        in the novel's order.
+        """
+        elemIds = sorted(self._descriptors, key=self._order.get)
+        return [
+            self._descriptors[elemId] for elemId in elemIds
+            if elemId != CH_ROOT
+        ]
+
+    def get_page_names(self, elemId):
+        """Return a list of the names to look up the element's page by.
+
+        An element whose page name is allocated to another element
+        is looked up by its allocated page name only.
+        """
+        descriptor = self.get_descriptor(elemId)
+        if descriptor is None:
+            return []
+
+        if descriptor.pageName != self._candidates[elemId].pageName:
+            return [descriptor.pageName]
+
+        return [pageName for pageName in descriptor.pageNames if pageName]
+
+    def refresh(self):
+        """Update the table with the current state of the novel."""
+        if self._mdl.novel is not self._novel:
+            self._novel = self._mdl.novel
+            self._candidates = {}
+            self._descriptors = {}
+            self._groups = {}
+            self._order = {}
+        changedGroups = set()
+        layout = self._novel.fields.get(ZIM_LAYOUT_TAG, LAYOUT_FLAT)
+        if layout != self._layout:
+            self._layout = layout
+            changedGroups.update(self._groups)
+        currentIds = set()
+        for elemId, element in self._get_elements():
+            currentIds.add(elemId)
+            position = len(currentIds)
+            candidate = self._candidates.get(elemId, None)
+            if candidate is not None:
+                pageNames = candidate.pageClass.get_page_names(element)
+                if candidate.pageNames == tuple(pageNames):
+                    if (
+                        self._order[elemId] != position
+                        and candidate.pageName is not None
+                    ):
+                        # The precedence within the group may have changed.
+                        changedGroups.add(
+                            PageIndex.normalize(candidate.pageName)
+                        )
+                    self._order[elemId] = position
+                    continue
+
+                self._leave_group(elemId, changedGroups)
+            self._order[elemId] = position
+            candidate = self._wikiFactory.new_page_descriptor(element, elemId)
+            self._candidates[elemId] = candidate
+            self._descriptors[elemId] = candidate
+            if candidate.pageName is not None:
+                key = PageIndex.normalize(candidate.pageName)
+                self._groups.setdefault(key, []).append(elemId)
+                changedGroups.add(key)
+        for elemId in set(self._candidates) - currentIds:
+            self._leave_group(elemId, changedGroups)
+            del self._candidates[elemId]
+            del self._descriptors[elemId]
+            del self._order[elemId]
+        for key in changedGroups:
+            self._allocate(key)
+
+    def _allocate(self, key):
+        """Allocate the page names of a group."""
+        group = self._groups.get(key, None)
+        if not group:
+            self._groups.pop(key, None)
+            return
+
+        group.sort(key=self._order.get)
+        if key not in self.RESERVED_NAMES:
+            self._descriptors[group[0]] = self._place(
+                self._candidates[group[0]]
+            )
+            group = group[1:]
+        for elemId in group:
+            candidate = self._candidates[elemId]
+            pageName = f'{candidate.pageName} ({elemId})'
+            self._descriptors[elemId] = self._place(
+                candidate._replace(
+                    pageName=pageName,
+                    fileName=candidate.pageClass.get_file_name(pageName),
+                )
+            )
+
+    def _get_elements(self):
+        """Generate (element ID, element) tuples in the novel's order."""
+        yield CH_ROOT, self._novel
+        for source in (
+            self._novel.characters,
+            self._novel.locations,
+            self._novel.items,
+        ):
+            for elemId in source:
+                yield elemId, source[elemId]
+
+    def _get_initial(self, pageName):
+        """Return the name of the shard for the page name."""
+        initial = pageName[:1].upper()
+        if initial.isalnum():
+            return initial
+
+        return self.OTHER_INITIALS
+
+    def _leave_group(self, elemId, changedGroups):
+        """Remove the element from the group of its own page name."""
+        pageName = self._candidates[elemId].pageName
+        if pageName is None:
+            return
+
+        key = PageIndex.normalize(pageName)
+        self._groups[key].remove(elemId)
+        changedGroups.add(key)
+
+    def _place(self, descriptor):
+        """Return the descriptor with the namespace of the page layout."""
+        typeNamespace = self.TYPE_NAMESPACES.get(descriptor.elemId[:2], None)
+        if typeNamespace is None:
+            return descriptor
+
+        if self._layout == LAYOUT_NAMESPACES:
+            return descriptor._replace(namespace=(typeNamespace,))
+
+        if self._layout == LAYOUT_SHARDED:
+            return descriptor._replace(
+                namespace=(
+                    typeNamespace,
+                    self._get_initial(descriptor.pageName),
+                )
+            )
+
+        return descriptor
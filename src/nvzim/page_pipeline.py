@@ -0,0 +1,105 @@
+"""Provide a class for wiki page rendering and concurrent writing.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import queue
+import threading
+
+
+class PagePipeline:
+    """Compare pages on the calling thread, or write them through a bounded queue.
+
+    The pages are rendered chunk by chunk, so no page is held
+    in memory as a whole. When writing, each page is rendered once;
+    the content hash is computed on the way.
+    Rendering and hashing is CPU-bound Python code that holds the GIL,
+    so it is not distributed among threads; only the file I/O is.
+    The pipeline does not touch the novelibre model or the GUI,
+    so the caller applies the link updates on the Tk thread afterwards.
+    """
+    QUEUE_SIZE = 64
+    # maximum number of hashed pages waiting to be written
+    WRITERS = 4
+
+    def __init__(self, maxWriters=None):
+        if maxWriters is None:
+            maxWriters = self.WRITERS
+        self.maxWriters = maxWriters
+
+    def compare(self, pages):
+        """Generate (page, comparison) tuples in the order of the pages.
+
+        Positional arguments:
+            pages -- iterable of ZimPage instances.
+
+        The comparison is the tuple returned by ZimPage.compare().
+        No page is written.
+        """
+        return self._map(pages, 'compare')
+
+    def write(self, pages, baseHashes=None):
+        """Write the pages; return a list of the pages actually written.
+
+        Positional arguments:
+            pages -- iterable of ZimPage instances.
+
+        Optional arguments:
+            baseHashes: dict -- key: page, value: hash of the page file.
+
+        A page with base hash is written only if its content differs
+        from the base hash, and the page file still has the base hash.
+        After writing, the pages' contentHash is set, 
+        whether written or not.
+        The iterable is consumed on the calling thread, 
+        so it may add the base hashes while generating the pages.
+        Raise the first exception that occurred when writing.
+        """
+        if baseHashes is None:
+            baseHashes = {}
+        writeQueue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        writtenPages = []
+        errors = []
+        writers = []
+        for __ in range(self.maxWriters):
+            writer = threading.Thread(
+                target=self._write_queued,
+                args=(writeQueue, baseHashes, writtenPages, errors),
+                daemon=True,
+            )
+            writer.start()
+            writers.append(writer)
+        try:
+            for page in pages:
+                writeQueue.put(page)
+        finally:
+            for __ in writers:
+                writeQueue.put(None)
+            for writer in writers:
+                writer.join()
+        if errors:
+            raise errors[0]
+
+        return writtenPages
+
+    def _map(self, pages, methodName):
+        """Generate (page, result) tuples in the order of the pages.
+
+        The page method specified by methodName is called 
+        on the calling thread, one page at a time.
+        """
+        for page in pages:
+            yield page, getattr(page, methodName)()
+
+    def _write_queued(self, writeQueue, baseHashes, writtenPages, errors):
+        while True:
+            page = writeQueue.get()
+            if page is None:
+                return
+
+            try:
+                if page.write(baseHash=baseHashes.get(page, None)):
+                    writtenPages.append(page)
+            except Exception as ex:
+                errors.append(ex)
@@ -0,0 +1,83 @@
+"""Provide a class for an inverted index of the novel's tags.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from nvzim.nvzim_globals import TAG_NAMESPACE
+from nvzim.tag_overview_page import TagOverviewPage
+from nvzim.tag_page import TagPage
+from nvzim.zim_tokenizer import normalize_tag
+
+
+class TagIndex:
+    """Map the novel's tags to the pages of the elements with the tag.
+
+    Tags are compared the way they are written to the element pages,
+    and not case sensitive, like Zim compares page names.
+    So each tag page file belongs to exactly one entry.
+    """
+    OVERVIEW_KEY = 'tags'
+    # manifest key of the tag overview page
+    PAGE_KEY_PREFIX = 'tags:'
+    # manifest key prefix of the tag pages; element IDs have no colon
+
+    def __init__(self):
+        self.tags = {}
+        # key: normalized tag in lower case
+        # value: (tag as spelled first, list of PageDescriptor instances)
+
+    def build(self, elementDescriptors):
+        """Build the index in a single pass over the elements.
+
+        Positional arguments:
+            elementDescriptors -- iterable of (element, PageDescriptor)
+                                  tuples, in the novel's order.
+        """
+        self.tags = {}
+        for element, descriptor in elementDescriptors:
+            if not element.tags or descriptor.fileName is None:
+                continue
+
+            for tag in element.tags:
+                key = normalize_tag(tag).lower()
+                if not key:
+                    continue
+
+                entry = self.tags.get(key, None)
+                if entry is None:
+                    self.tags[key] = (tag, [descriptor])
+                elif entry[1][-1] is not descriptor:
+                    # Different spellings of a tag are listed once.
+                    entry[1].append(descriptor)
+
+    def new_pages(self, homeDir, homeNamespace):
+        """Return a list of (manifest key, page) tuples.
+
+        Positional arguments:
+            homeDir: str -- Path to the home namespace directory.
+            homeNamespace: str -- Name of the home namespace.
+
+        The list comprises a page per tag and the tag overview page,
+        or nothing if the novel has no tags.
+        """
+        if not self.tags:
+            return []
+
+        overviewPage = TagOverviewPage(
+            f'{homeDir}/{TAG_NAMESPACE}{TagOverviewPage.EXTENSION}'
+        )
+        pages = []
+        for key in sorted(self.tags):
+            tag, descriptors = self.tags[key]
+            page = TagPage(
+                f'{homeDir}/{TAG_NAMESPACE}/{TagPage.get_file_name(key)}',
+                tag,
+                homeNamespace,
+            )
+            for descriptor in descriptors:
+                page.add_link(descriptor)
+            overviewPage.add_tag(key, tag, len(descriptors))
+            pages.append((f'{self.PAGE_KEY_PREFIX}{key}', page))
+        pages.append((self.OVERVIEW_KEY, overviewPage))
+        return pages
@@ -0,0 +1,43 @@
+"""Provide a class for a Zim Wiki page listing the novel's tags.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from nvzim.nvzim_globals import TAG_NAMESPACE
+from nvzim.zim_page import ZimPage
+
+
+class TagOverviewPage(ZimPage):
+    """A generated page linking the tag pages, which are its subpages."""
+    __slots__ = ('links',)
+
+    def __init__(self, filePath):
+        super().__init__(filePath, None)
+        self.links = []
+        # link lines in the order of the tags
+
+    def add_tag(self, pageName, tag, count):
+        """Add a link to a tag page.
+
+        Positional arguments:
+            pageName: str -- Name of the tag page, relative to this page.
+            tag: str -- The tag as spelled in the novel.
+            count: int -- Number of elements with the tag.
+        """
+        self.links.append(f'[[+{pageName}|{tag}]] ({count})')
+
+    @classmethod
+    def get_page_names(cls, element):
+        """Return a list of page name candidates.
+        
+        Overrides the superclass method.
+        """
+        return [TAG_NAMESPACE]
+
+    def iter_content(self):
+        """Generate the page content lines.
+
+        Overrides the superclass method.
+        """
+        yield from self.links
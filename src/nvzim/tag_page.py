@@ -0,0 +1,61 @@
+"""Provide a class for a Zim Wiki page listing the elements with a tag.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from bisect import insort
+
+from nvzim.book_page import BookPage
+from nvzim.nvzim_locale import _
+from nvzim.zim_page import ZimPage
+
+
+class TagPage(ZimPage):
+    """A generated page linking the pages of the elements with a tag.
+
+    The page's element is the tag, as spelled in the novel.
+    The links are absolute, so that they cannot resolve
+    to another tag page of the same namespace.
+    """
+    __slots__ = ('links', 'homeNamespace')
+
+    def __init__(self, filePath, tag, homeNamespace):
+        super().__init__(filePath, tag)
+        self.homeNamespace = homeNamespace
+        self.links = {}
+        # key: element ID prefix
+        # value: sorted list of link lines
+        for prefix, __ in BookPage.LINK_SECTIONS:
+            self.links[prefix] = []
+
+    def add_link(self, descriptor):
+        """Add a link to the page of the element specified by descriptor."""
+        sectionLinks = self.links.get(descriptor.elemId[:2], None)
+        if sectionLinks is not None:
+            insort(
+                sectionLinks,
+                (
+                    f'[[:{self.homeNamespace}:{descriptor.get_link()}'
+                    f'|{descriptor.pageName}]]'
+                ),
+            )
+
+    @classmethod
+    def get_page_names(cls, element):
+        """Return a list of page name candidates for the tag.
+        
+        Overrides the superclass method.
+        """
+        return [element]
+
+    def iter_content(self):
+        """Generate the page content lines.
+
+        Overrides the superclass method.
+        """
+        for prefix, heading in BookPage.LINK_SECTIONS:
+            if self.links[prefix]:
+                yield self.get_h2(_(heading))
+                yield from self.links[prefix]
+                yield '\n'
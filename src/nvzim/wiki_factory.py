@@ -18,12 +18,30 @@ class WikiFactory:
     def __init__(self, model):
         self._mdl = model
 
-    def new_wiki_page(self, element, elemId, filePath):
-        """Return the reference to a new ZimPage subclass instance."""
+    def get_page_class(self, elemId):
+        """Return the ZimPage subclass for the element ID, or None."""
         if elemId == CH_ROOT:
-            return BookPage(filePath, element)
+            return BookPage
 
         if elemId.startswith(CHARACTER_PREFIX):
+            return CharacterPage
+
+        if elemId.startswith(LOCATION_PREFIX):
+            return WorldElementPage
+
+        if elemId.startswith(ITEM_PREFIX):
+            return WorldElementPage
+
+    def new_page_descriptor(self, element, elemId):
+        """Return a PageDescriptor for the element's page, or None."""
+        pageClass = self.get_page_class(elemId)
+        if pageClass is not None:
+            return pageClass.get_descriptor(element, elemId)
+
+    def new_wiki_page(self, element, elemId, filePath):
+        """Return the reference to a new ZimPage subclass instance."""
+        pageClass = self.get_page_class(elemId)
+        if pageClass is CharacterPage:
             return CharacterPage(
                 filePath,
                 element,
@@ -31,9 +49,6 @@ class WikiFactory:
                 field2Name=self._mdl.novel.crField2,
             )
 
-        if elemId.startswith(LOCATION_PREFIX):
-            return WorldElementPage(filePath, element)
-
-        if elemId.startswith(ITEM_PREFIX):
-            return WorldElementPage(filePath, element)
+        if pageClass is not None:
+            return pageClass(filePath, element)
 
@@ -4,9 +4,7 @@ Copyright (c) 2025 Peter Triesberger
 For further information see https://github.com/peter88213/nv_zim
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
-import glob
 import os
-import subprocess
 from tkinter import filedialog
 
 from nvlib.controller.sub_controller import SubController
@@ -21,18 +19,35 @@ from nvlib.novx_globals import LOCATION_PREFIX
 from nvlib.novx_globals import PLOT_LINE_PREFIX
 from nvlib.novx_globals import PL_ROOT
 from nvlib.novx_globals import norm_path
+from nvzim.diagnostics import DIAGNOSTICS
+from nvzim.auto_linker import AutoLinker
+from nvzim.notebook_registry import NotebookRegistry
+from nvzim.nvzim_globals import LAYOUT_FLAT
+from nvzim.nvzim_globals import TAG_NAMESPACE
+from nvzim.nvzim_globals import ZIM_AUTOLINK_TAG
+from nvzim.nvzim_globals import ZIM_LAYOUT_TAG
 from nvzim.nvzim_globals import ZIM_NOTEBOOK_ABS_TAG
 from nvzim.nvzim_globals import ZIM_NOTEBOOK_REL_TAG
 from nvzim.nvzim_globals import ZIM_PAGE_ABS_TAG
 from nvzim.nvzim_globals import ZIM_PAGE_REL_TAG
 from nvzim.nvzim_locale import _
+from nvzim.page_name_table import PageNameTable
+from nvzim.page_pipeline import PagePipeline
+from nvzim.tag_index import TagIndex
 from nvzim.wiki_factory import WikiFactory
+from nvzim.wiki_manifest import WikiManifest
+from nvzim.wiki_plan import WikiPlan
+from nvzim.zim_launcher import ZimLauncher
 from nvzim.zim_notebook import ZimNotebook
 from nvzim.zim_page import ZimPage
 
 
 class WikiManager(SubController):
 
+    BOOK_PAGE_DELAY = 1000
+    # milliseconds to wait for further page changes in Zim
+    # before updating the book page
+
     def __init__(self, model, view, controller, windowTitle):
         self._mdl = model
         self._ui = view
@@ -42,6 +57,20 @@ class WikiManager(SubController):
         self.zimApp = self.launchers.get(ZimNotebook.EXTENSION, '')
         self.windowTitle = windowTitle
         self.wikiFactory = WikiFactory(self._mdl)
+        self.pageNameTable = PageNameTable(self._mdl, self.wikiFactory)
+        self.notebookRegistry = NotebookRegistry()
+        self.zimLauncher = ZimLauncher()
+        self.brokenLinks = None
+        # set of the IDs of elements linked to missing project wiki pages;
+        # None if unknown
+        self._linkedElements = None
+        # key: normalized page file path relative to the home directory
+        # value: set of the IDs of the elements linked to the page
+        # None if the links have changed since the map was built
+        self._changedPages = set()
+        # paths of the page files created or deleted in Zim,
+        # pending for the book page update
+        self._bookPageTimerId = None
 
     def check_home_dir(self):
         """Create the project wiki's home directory, if missing."""
@@ -51,18 +80,134 @@ class WikiManager(SubController):
         if not os.path.isdir(self.prjWiki.homeDir):
             os.makedirs(self.prjWiki.homeDir)
 
+    @DIAGNOSTICS.timed('WikiManager.check_links')
+    def check_links(self):
+        """Check all wiki links, and repair the broken ones, if possible.
+        
+        The link targets are checked with one listing per directory.
+        Missing pages are looked up by name in the project wiki.
+        All repairs are applied after checking, and a report is shown.
+        """
+        self._ui.restore_status()
+        if self._mdl.prjFile is None:
+            return
+
+        if self._ctrl.check_lock():
+            return
+
+        self._ui.propertiesView.apply_changes()
+        repaired = []
+        unresolved = []
+
+        # Check the notebook link.
+        fields = self._mdl.novel.fields
+        notebookPaths = self._get_link_paths(
+            fields.get(ZIM_NOTEBOOK_ABS_TAG, None),
+            fields.get(ZIM_NOTEBOOK_REL_TAG, None),
+        )
+        if notebookPaths:
+            existingFiles = self._get_existing_files(notebookPaths)
+            notebookPath = next(
+                (path for path in notebookPaths if path in existingFiles),
+                None,
+            )
+            if notebookPath is None:
+                unresolved.append(
+                    f'{self._mdl.novel.title}: {norm_path(notebookPaths[0])}'
+                )
+            elif notebookPath != fields.get(ZIM_NOTEBOOK_ABS_TAG, None):
+                self.set_notebook_links(notebookPath)
+                repaired.append(
+                    f'{self._mdl.novel.title}: {norm_path(notebookPath)}'
+                )
+        if self.prjWiki is None and self.get_project_wiki_link() is not None:
+            self.set_project_wiki()
+
+        # Collect the page links, and check them in one pass.
+        elementLinks = []
+        linkPaths = []
+        for elemId, element in self._get_linkable_elements():
+            paths = self._get_link_paths(
+                element.fields.get(ZIM_PAGE_ABS_TAG, None),
+                element.fields.get(ZIM_PAGE_REL_TAG, None),
+            )
+            if paths:
+                elementLinks.append((elemId, element, paths))
+                linkPaths.extend(paths)
+        existingFiles = self._get_existing_files(linkPaths)
+
+        # Repair the broken links.
+        if self.prjWiki is not None and len(existingFiles) < len(linkPaths):
+            self.prjWiki.pageIndex.refresh()
+            self.pageNameTable.refresh()
+        linkedPages = []
+        repairedIds = set()
+        for elemId, element, paths in elementLinks:
+            pagePath = next(
+                (path for path in paths if path in existingFiles),
+                None,
+            )
+            if pagePath is None and self.prjWiki is not None:
+                pagePath = self._find_page(element, elemId, paths[0])
+            if pagePath is None:
+                unresolved.append(f'{element.title}: {norm_path(paths[0])}')
+                continue
+
+            if pagePath != element.fields.get(ZIM_PAGE_ABS_TAG, None):
+                linkedPages.append((element, pagePath))
+                repairedIds.add(elemId)
+                repaired.append(f'{element.title}: {norm_path(pagePath)}')
+        self.set_page_links_batch(linkedPages)
+        if self.brokenLinks is not None:
+            self.brokenLinks -= repairedIds
+
+        checkedLinks = len(elementLinks)
+        if notebookPaths:
+            checkedLinks += 1
+        self._ui.set_status(
+            (
+                f'{_("Wiki links checked")}: {checkedLinks}, '
+                f'{len(repaired)} {_("repaired")}, '
+                f'{len(unresolved)} {_("broken")}.'
+            )
+        )
+        if not repaired and not unresolved:
+            return
+
+        report = []
+        if repaired:
+            report.append(f'{_("Repaired")}:')
+            report.extend(repaired)
+            report.append('')
+        if unresolved:
+            report.append(f'{_("Not found")}:')
+            report.extend(unresolved)
+        self._ui.show_info(
+            _('Some wiki links were broken.'),
+            title=self.windowTitle,
+            detail='\n'.join(report),
+        )
+
     def create_blank_prj_notebook(self, prjWikiDir):
         os.makedirs(prjWikiDir, exist_ok=True)
+        if self.prjWiki is not None:
+            self.prjWiki.close()
         self.prjWiki = ZimNotebook(
             self.zimApp,
             dirPath=prjWikiDir,
-            wikiName=self._mdl.novel.title
+            wikiName=self._mdl.novel.title,
+            tkRoot=self._ui.root,
+            on_indexed=self._on_indexed,
+            launcher=self.zimLauncher,
             )
+        self.notebookRegistry.add_notebook(self.prjWiki.filePath)
+        self.prjWiki.start_monitor(self._on_pages_changed)
         self.set_notebook_links(self.prjWiki.filePath)
         self._ui.set_status(
             f'{_("Wiki created")}: "{norm_path(self.prjWiki.filePath)}"'
         )
 
+    @DIAGNOSTICS.timed('WikiManager.create_project_wiki')
     def create_project_wiki(self):
         self._ui.restore_status()
         if self._mdl.prjFile is None:
@@ -89,16 +234,30 @@ class WikiManager(SubController):
             os.rename(prjWikiDir, backupWikiDir)
 
         self.create_blank_prj_notebook(prjWikiDir)
-        sources = [
-            self._mdl.novel.characters,
-            self._mdl.novel.locations,
-            self._mdl.novel.items,
-        ]
-        for source in sources:
-            for elemId in source:
-                self.create_wiki_page(source[elemId], elemId)
-            bookPageName = self.create_wiki_page(self._mdl.novel, CH_ROOT)
+        manifest = WikiManifest(self.prjWiki.dirPath)
+        linkedPages = []
+        self.pageNameTable.refresh()
+        descriptors = self.pageNameTable.get_descriptors()
+        elementPages = self._new_element_pages(descriptors)
+        self._make_namespace_dirs(descriptors)
+        pipeline = PagePipeline()
+        pipeline.write([page for __, __, page in elementPages])
+        self._register_pages(elementPages, manifest, linkedPages)
+        tagPages = self._new_tag_pages(descriptors, elementPages)
+        pipeline.write([page for __, __, page in tagPages])
+        self._register_pages(tagPages, manifest, linkedPages)
+        self.set_page_links_batch(linkedPages)
+        bookPage = self.new_project_page(self._mdl.novel, CH_ROOT)
+        bookPage.collect_links(descriptors)
+        bookPageName = self.create_wiki_page(
+            self._mdl.novel,
+            CH_ROOT,
+            manifest,
+            bookPage,
+        )
+        # The book page comes last, because it links existing pages.
 
+        manifest.write()
         self.prjWiki.update_index()
         self._ui.set_status(
             (
@@ -108,16 +267,17 @@ class WikiManager(SubController):
         )
         self.prjWiki.open(initialPage=f'{self.prjWiki.HOME}:{bookPageName}')
 
-    def create_wiki_page(self, element, elemId):
-        newPage = self.wikiFactory.new_wiki_page(element, elemId, None)
-        newPageName = newPage.new_page_name()
-        newPage.filePath = (
-            f"{self.prjWiki.homeDir}/{newPageName.replace(' ', '_')}"
-            f"{newPage.EXTENSION}"
-        )
+    def create_wiki_page(self, element, elemId, manifest=None, newPage=None):
+        if newPage is None:
+            newPage = self.new_project_page(element, elemId)
         newPage.write()
+        if manifest is not None:
+            manifest.pages[elemId] = dict(
+                path=manifest.get_rel_path(newPage.filePath),
+                hash=newPage.contentHash,
+            )
         self.set_page_links(element, newPage.filePath)
-        return newPageName
+        return newPage.new_page_name()
 
     def get_element(self, elemId):
         """Return the element specified by elemId, or the novel reference."""
@@ -171,26 +331,84 @@ class WikiManager(SubController):
 
     def get_wiki_page_link(self, element):
         """Return the element's wiki page path, if any."""
-        wikiPagePath = element.fields.get(ZIM_PAGE_ABS_TAG, None)
+        wikiPagePath = self._get_page_link_path(element)
         if wikiPagePath is None:
-            wikiPagePath = element.fields.get(ZIM_PAGE_REL_TAG, None)
-            if wikiPagePath is None:
-                return
-
-            wikiPagePath = self._ctrl.linkProcessor.expand_path(wikiPagePath)
-
-        if not wikiPagePath.endswith(ZimPage.EXTENSION):
             return
 
+        DIAGNOSTICS.count(DIAGNOSTICS.STAT)
         if os.path.isfile(wikiPagePath):
             return wikiPagePath
 
+    @DIAGNOSTICS.timed('WikiManager.import_from_wiki')
+    def import_from_wiki(self):
+        """Update the novel elements with their linked wiki pages' content.
+        
+        Skip the pages that have not changed since the last import,
+        or since they were generated.
+        """
+        self._ui.restore_status()
+        if self._mdl.prjFile is None:
+            return
+
+        if self._ctrl.check_lock():
+            return
+
+        self._ui.propertiesView.apply_changes()
+        manifest = None
+        prjWikiPath = self.get_project_wiki_link()
+        if prjWikiPath is not None:
+            manifest = WikiManifest(os.path.dirname(prjWikiPath))
+            manifest.read()
+        importedElements = 0
+        for source in (
+            self._mdl.novel.characters,
+            self._mdl.novel.locations,
+            self._mdl.novel.items,
+        ):
+            for elemId in source:
+                element = source[elemId]
+                filePath = self.get_wiki_page_link(element)
+                if filePath is None:
+                    continue
+
+                if self._import_page(element, elemId, filePath, manifest):
+                    importedElements += 1
+        if manifest is not None:
+            manifest.write()
+        if importedElements:
+            self._ui.set_status(
+                f'{_("Elements updated from the wiki")}: {importedElements}'
+            )
+        else:
+            self._ui.set_status(f'#{_("No changes found in the wiki")}.')
+
+    def new_project_page(self, element, elemId, descriptor=None):
+        """Return a new page object with a path in the project wiki.
+
+        Optional arguments:
+            descriptor: PageDescriptor -- The element's page descriptor,
+                                          if already computed.
+        """
+        if descriptor is None:
+            descriptor = self.pageNameTable.get_descriptor(elemId)
+        return self.wikiFactory.new_wiki_page(
+            element,
+            elemId,
+            f'{self.prjWiki.homeDir}/{descriptor.get_rel_path()}',
+        )
+
     def on_close(self):
+        self._cancel_book_page_update()
+        if self.prjWiki is not None:
+            self.prjWiki.close()
         self.prjWiki = None
+        self.brokenLinks = None
+        self.zimLauncher.reap()
 
     def open_element_page(self):
         self.open_page_by_id(self._ui.propertiesView.activeView.elementId)
 
+    @DIAGNOSTICS.timed('WikiManager.open_page_by_id')
     def open_page_by_id(self, elemId):
         self._ui.restore_status()
         if self._mdl.prjFile.filePath is None:
@@ -208,23 +426,25 @@ class WikiManager(SubController):
         if filePath is None:
 
             # Try to find an existing project wiki page.
-            wikiPage = self.wikiFactory.new_wiki_page(element, elemId, None)
+            self.pageNameTable.refresh()
+            descriptor = self.pageNameTable.get_descriptor(elemId)
             self.set_project_wiki()
             if self.prjWiki is None:
                 return
 
-            for pageName in wikiPage.page_names:
-                if pageName:
-                    filePath = self.prjWiki.get_page_path_by_name(pageName)
-                    if filePath is not None:
-                        if self._ui.ask_yes_no(
-                            title=_('Matching page found'),
-                            message=_('Open this page and create a link?'),
-                            detail=os.path.normpath(filePath)
-                        ):
-                            break
-                        else:
-                            filePath = None
+            for pageName in self.pageNameTable.get_page_names(elemId):
+                filePath = self.prjWiki.get_page_path_by_name(pageName)
+                if filePath is not None and self._is_tag_page(filePath):
+                    filePath = None
+                if filePath is not None:
+                    if self._ui.ask_yes_no(
+                        title=_('Matching page found'),
+                        message=_('Open this page and create a link?'),
+                        detail=os.path.normpath(filePath)
+                    ):
+                        break
+                    else:
+                        filePath = None
 
         if filePath is None:
 
@@ -254,7 +474,7 @@ class WikiManager(SubController):
                 else:
                     initialDir = os.path.dirname(self._mdl.prjFile.filePath)
                 filePath = filedialog.askopenfilename(
-                    filetypes=[(ZimPage.DESCRIPTION, ZimPage.EXTENSION)],
+                    filetypes=[(_(ZimPage.DESCRIPTION), ZimPage.EXTENSION)],
                     defaultextension=ZimPage.EXTENSION,
                     initialdir=initialDir
                 )
@@ -268,22 +488,43 @@ class WikiManager(SubController):
                     return
 
                 # Create a new page in the project wiki.
-                self.check_home_dir()
-                fileName = wikiPage.new_page_name().replace(' ', '_')
                 filePath = (
-                    f'{self.prjWiki.homeDir}/{fileName}{wikiPage.EXTENSION}'
+                    f'{self.prjWiki.homeDir}/{descriptor.get_rel_path()}'
+                )
+                os.makedirs(os.path.dirname(filePath), exist_ok=True)
+                wikiPage = self.wikiFactory.new_wiki_page(
+                    element,
+                    elemId,
+                    filePath,
                 )
-                wikiPage.filePath = filePath
-                wikiPage.write()
-                pageCreated = True
+                if elemId == CH_ROOT:
+                    wikiPage.collect_links(
+                        self.pageNameTable.get_descriptors()
+                    )
+                else:
+                    wikiPage.autoLinker = self._new_auto_linker(
+                        self.pageNameTable.get_descriptors()
+                    )
+                pageCreated = wikiPage.write()
 
         self.set_page_links(element, filePath)
         if pageCreated:
+            changedPages = [self.prjWiki.get_page_name(filePath)]
+            if self.update_book_page(
+                elemId,
+                newPageName=descriptor.get_link(),
+            ):
+                changedPages.append(
+                    self.prjWiki.get_page_name(
+                        self.get_wiki_page_link(self._mdl.novel)
+                    )
+                )
             self._ui.set_status(f"{_('Wiki page created')}.")
             # overwriting the "wiki link" message.
-            self.prjWiki.update_index()
+            self.prjWiki.update_index(changedPages)
         self.open_page_file(filePath)
 
+    @DIAGNOSTICS.timed('WikiManager.open_page_file')
     def open_page_file(self, filePath):
         """Return True if the file specified by filepath is opened with Zim."""
         if not self.zim_is_installed():
@@ -294,30 +535,26 @@ class WikiManager(SubController):
         if extension != ZimPage.EXTENSION:
             return False
 
-        pagePath = root.split('/')
-        zimPages = []
-        # this is for the page path in Zim notation
-
-        # Search backwards through the file branch.
-        # If the page is a child of a Zim Wiki, start a subprocess to open it.
-        while pagePath:
-            zimPages.insert(0, pagePath.pop())
-            zimPath = '/'.join(pagePath)
-            zimNotebook = glob.glob(
-                norm_path(f'{zimPath}/*{ZimNotebook.EXTENSION}')
-            )
-            if zimNotebook:
-                # the link path belongs to a Zim wiki
-                subprocess.Popen(
-                    [
-                        self.zimApp,
-                        zimNotebook[0],
-                        ":".join(zimPages)
-                    ]
-                )
-                return True
+        zimPage = None
+        if self.prjWiki is not None:
+            # Resolve pages of the project wiki through the index.
+            zimPage = self.prjWiki.find_page_name(filePath)
+        if zimPage is not None:
+            notebookPath = self.prjWiki.filePath
+        else:
+            notebookPath, zimPage = self.notebookRegistry.find_notebook(root)
+        if notebookPath is None:
+            return False
 
-        return False
+        # the link path belongs to a Zim wiki
+        self.zimLauncher.launch(
+            [
+                self.zimApp,
+                notebookPath,
+                zimPage,
+            ]
+        )
+        return True
 
     def open_project_wiki(self):
         if self._mdl.prjFile is None:
@@ -334,6 +571,64 @@ class WikiManager(SubController):
         if self.prjWiki is not None:
             self.prjWiki.open()
 
+    @DIAGNOSTICS.timed('WikiManager.plan_project_wiki')
+    def plan_project_wiki(self):
+        """Return a WikiPlan for creating the project wiki, or None.
+
+        Every page is rendered and hashed chunk by chunk, and compared
+        with the page file at its place in the existing notebook.
+        Nothing is written; the notebook is not even opened.
+        Return None if the project has no path.
+        """
+        if self._mdl.prjFile is None or self._mdl.prjFile.filePath is None:
+            return None
+
+        homeDir = f'{self.get_project_wiki_dir()}/{ZimNotebook.HOME}'
+        plan = WikiPlan(homeDir)
+        self.pageNameTable.refresh()
+        descriptors = self.pageNameTable.get_descriptors()
+        plan.collisions = self.pageNameTable.get_collisions()
+        autoLinker = self._new_auto_linker(descriptors)
+        pages = []
+        elementDescriptors = []
+        for descriptor in descriptors:
+            element = self.get_element(descriptor.elemId)
+            page = self.wikiFactory.new_wiki_page(
+                element,
+                descriptor.elemId,
+                f'{homeDir}/{descriptor.get_rel_path()}',
+            )
+            page.autoLinker = autoLinker
+            pages.append(page)
+            elementDescriptors.append((element, descriptor))
+        tagIndex = TagIndex()
+        tagIndex.build(elementDescriptors)
+        for __, page in tagIndex.new_pages(homeDir, ZimNotebook.HOME):
+            pages.append(page)
+
+        # The book page links all element pages, as they will exist.
+        bookPage = self.wikiFactory.new_wiki_page(
+            self._mdl.novel,
+            CH_ROOT,
+            (
+                f'{homeDir}/'
+                f'{self.pageNameTable.get_descriptor(CH_ROOT).get_rel_path()}'
+            ),
+        )
+        bookPage.collect_links(
+            descriptors,
+            pageFiles=set(
+                descriptor.get_rel_path() for descriptor in descriptors
+                if descriptor.fileName is not None
+            ),
+        )
+        pages.append(bookPage)
+        for page, comparison in PagePipeline().compare(pages):
+            plan.add_page(page.filePath[len(homeDir) + 1:], comparison)
+        plan.find_orphans()
+        return plan
+
+    @DIAGNOSTICS.timed('WikiManager.remove_all_links')
     def remove_all_links(self):
         self._ui.restore_status()
         if self._mdl.prjFile is None:
@@ -350,7 +645,11 @@ class WikiManager(SubController):
 
         removed = False
         if self.remove_notebook_links():
+            self._cancel_book_page_update()
+            if self.prjWiki is not None:
+                self.prjWiki.close()
             self.prjWiki = None
+            self.brokenLinks = None
             removed = True
         if self.remove_page_links(self._mdl.novel):
             removed = True
@@ -398,6 +697,8 @@ class WikiManager(SubController):
         except KeyError:
             pass
         element.fields = fields
+        if removed:
+            self._linkedElements = None
         return removed
 
     def remove_page_link_after_asking(self):
@@ -420,6 +721,7 @@ class WikiManager(SubController):
         if self.remove_page_links(element):
             self._ui.set_status(f"#{_('Wiki link removed')}.")
 
+    @DIAGNOSTICS.timed('WikiManager.remove_selected_page_links')
     def remove_selected_page_links(self):
         self._ui.restore_status()
         if self._mdl.prjFile is None:
@@ -482,6 +784,55 @@ class WikiManager(SubController):
                             removed = True
         self.set_removal_status(removed)
 
+    def set_auto_link(self, enabled):
+        """Set whether element names are linked in the project wiki pages.
+        
+        Positional arguments:
+            enabled: bool -- If True, mentions of element names
+                             in descriptions, bios, and goals are linked.
+
+        The setting is stored with the project. The pages are updated
+        when the project wiki is synchronized.
+        Return True if the setting has changed.
+        """
+        self._ui.restore_status()
+        if self._ctrl.check_lock():
+            return False
+
+        fields = self._mdl.novel.fields
+        if bool(fields.get(ZIM_AUTOLINK_TAG, None)) == enabled:
+            return False
+
+        if enabled:
+            fields[ZIM_AUTOLINK_TAG] = '1'
+        else:
+            del fields[ZIM_AUTOLINK_TAG]
+        self._mdl.novel.fields = fields
+        self._ui.set_status(
+            f"#{_('Name linking changed. Synchronize the project wiki to update the pages')}."
+        )
+        return True
+
+    def set_diagnostics(self, enabled):
+        """Start or stop recording diagnostics; return True on success."""
+        if not enabled:
+            DIAGNOSTICS.disable()
+            return True
+
+        try:
+            DIAGNOSTICS.enable()
+        except OSError as ex:
+            self._ui.set_status(f'!{ex}')
+            return False
+
+        self._ui.set_status(
+            (
+                f'#{_("Recording diagnostics")}: '
+                f'"{norm_path(DIAGNOSTICS.logPath)}"'
+            )
+        )
+        return True
+
     def set_removal_status(self, removed):
         if removed:
             self._ui.set_status(f"{_('Wiki link(s) removed')}.")
@@ -508,26 +859,55 @@ class WikiManager(SubController):
         if message is not None:
             self._ui.set_status(message)
 
+    def set_page_layout(self, layout):
+        """Set the layout of the element pages in the project wiki.
+        
+        Positional arguments:
+            layout: str -- LAYOUT_FLAT, LAYOUT_NAMESPACES, or LAYOUT_SHARDED.
+
+        The layout is stored with the project. The pages are moved
+        when the project wiki is synchronized.
+        Return True if the layout has changed.
+        """
+        self._ui.restore_status()
+        if self._ctrl.check_lock():
+            return False
+
+        fields = self._mdl.novel.fields
+        if fields.get(ZIM_LAYOUT_TAG, LAYOUT_FLAT) == layout:
+            return False
+
+        if layout == LAYOUT_FLAT:
+            del fields[ZIM_LAYOUT_TAG]
+        else:
+            fields[ZIM_LAYOUT_TAG] = layout
+        self._mdl.novel.fields = fields
+        self._ui.set_status(
+            f"#{_('Page layout changed. Synchronize the project wiki to move the pages')}."
+        )
+        return True
+
     def set_page_links(self, element, wikiPagePath):
         self._ui.restore_status()
         if self._ctrl.isLocked:
             return
 
-        fields = element.fields
-        initialAbsPath = fields.get(ZIM_PAGE_ABS_TAG, None)
-        initialRelPath = fields.get(ZIM_PAGE_REL_TAG, None)
-        fields[ZIM_PAGE_ABS_TAG] = wikiPagePath
-        relPath = self._ctrl.linkProcessor.shorten_path(wikiPagePath)
-        fields[ZIM_PAGE_REL_TAG] = relPath
-        element.fields = fields
-        message = None
-        if initialAbsPath is None or initialRelPath is None:
-            message = f"#{_('Wiki link created')}."
-        elif initialAbsPath != wikiPagePath  or initialRelPath != relPath:
-            message = f"#{_('Broken link fixed')}."
+        message = self._update_page_link_fields(element, wikiPagePath)
         if message is not None:
             self._ui.set_status(message)
 
+    def set_page_links_batch(self, linkedPages):
+        """Set the wiki page links of several elements at once.
+        
+        Positional arguments:
+            linkedPages -- list of (element, wiki page path) tuples.
+        """
+        if self._ctrl.isLocked:
+            return
+
+        for element, wikiPagePath in linkedPages:
+            self._update_page_link_fields(element, wikiPagePath)
+
     def set_project_wiki(self):
         self._ui.restore_status()
         if self._mdl.prjFile.filePath is None:
@@ -543,7 +923,15 @@ class WikiManager(SubController):
         if prjWikiPath is not None and os.path.isfile(prjWikiPath):
 
             # Open an existing notebook.
-            self.prjWiki = ZimNotebook(self.zimApp, filePath=prjWikiPath)
+            self.prjWiki = ZimNotebook(
+                self.zimApp,
+                filePath=prjWikiPath,
+                tkRoot=self._ui.root,
+                on_indexed=self._on_indexed,
+                launcher=self.zimLauncher,
+            )
+            self.notebookRegistry.add_notebook(self.prjWiki.filePath)
+            self.prjWiki.start_monitor(self._on_pages_changed)
             self.set_notebook_links(self.prjWiki.filePath)
             return
 
@@ -566,18 +954,290 @@ class WikiManager(SubController):
 
             # Select an existing notebook.
             prjWikiPath = filedialog.askopenfilename(
-                filetypes=[(ZimNotebook.DESCRIPTION, ZimNotebook.EXTENSION)],
+                filetypes=[
+                    (_(ZimNotebook.DESCRIPTION), ZimNotebook.EXTENSION),
+                ],
                 defaultextension=ZimNotebook.EXTENSION,
                 initialdir=os.path.dirname(self._mdl.prjFile.filePath),
             )
             if not prjWikiPath:
                 return
 
-            self.prjWiki = ZimNotebook(self.zimApp, filePath=prjWikiPath)
+            self.prjWiki = ZimNotebook(
+                self.zimApp,
+                filePath=prjWikiPath,
+                tkRoot=self._ui.root,
+                on_indexed=self._on_indexed,
+                launcher=self.zimLauncher,
+            )
+            self.notebookRegistry.add_notebook(self.prjWiki.filePath)
+            self.prjWiki.start_monitor(self._on_pages_changed)
             self.set_notebook_links(self.prjWiki.filePath)
         else:
             self.create_blank_prj_notebook(self.get_project_wiki_dir())
 
+    def show_diagnostics(self):
+        """Show a summary of the recorded diagnostics."""
+        if DIAGNOSTICS.enabled:
+            message = _('Diagnostics are being recorded.')
+        else:
+            message = _('Diagnostics are not being recorded.')
+        self._ui.show_info(
+            message,
+            title=f'{self.windowTitle} - {_("Diagnostics")}',
+            detail='\n'.join(DIAGNOSTICS.get_summary()),
+        )
+
+    def show_wiki_plan(self):
+        """Show what creating the project wiki would do."""
+        self._ui.restore_status()
+        if self._mdl.prjFile is None:
+            return
+
+        if self._mdl.prjFile.filePath is None:
+            self._ui.set_status(
+                f"!{_('Cannot define a project wiki without project path')}."
+            )
+            return
+
+        plan = self.plan_project_wiki()
+        self._ui.show_info(
+            _('Creating the project wiki would move the current notebook to a backup, and write all pages.'),
+            title=f'{self.windowTitle} - {_("Wiki plan")}',
+            detail='\n'.join(plan.get_summary()),
+        )
+
+    @DIAGNOSTICS.timed('WikiManager.sync_project_wiki')
+    def sync_project_wiki(self):
+        """Update the project wiki, rewriting only the changed pages."""
+        self._ui.restore_status()
+        if self._mdl.prjFile is None:
+            return
+
+        if self._mdl.prjFile.filePath is None:
+            self._ui.set_status(
+                f"!{_('Cannot define a project wiki without project path')}."
+            )
+            return
+
+        if self.get_project_wiki_link() is None:
+            self.create_project_wiki()
+            return
+
+        self.set_project_wiki()
+        if self.prjWiki is None:
+            return
+
+        self.check_home_dir()
+        manifest = WikiManifest(self.prjWiki.dirPath)
+        manifest.read()
+        counts = dict(created=0, updated=0, removed=0)
+        keptPages = []
+        linkedPages = []
+        newPages = set()
+        movedPages = set()
+        pageDirs = set()
+        # directories of the removed pages
+        checkedPages = []
+        # (element ID, element, page) tuples of the pages passed for writing
+        baseHashes = {}
+        # key: page passed for writing
+        # value: content hash of the page file, as generated before
+        self.pageNameTable.refresh()
+        descriptors = self.pageNameTable.get_descriptors()
+        elementPages = self._new_element_pages(descriptors)
+        self._make_namespace_dirs(descriptors)
+        pipeline = PagePipeline()
+        writtenPages = pipeline.write(
+            self._get_changed_pages(
+                elementPages,
+                manifest,
+                linkedPages,
+                newPages,
+                movedPages,
+                keptPages,
+                pageDirs,
+                checkedPages,
+                baseHashes,
+            ),
+            baseHashes,
+        )
+
+        # Only the tag pages whose content has changed are rewritten.
+        tagPages = self._new_tag_pages(descriptors, elementPages)
+        writtenPages.extend(
+            pipeline.write(
+                self._get_changed_pages(
+                    tagPages,
+                    manifest,
+                    linkedPages,
+                    newPages,
+                    movedPages,
+                    keptPages,
+                    pageDirs,
+                    checkedPages,
+                    baseHashes,
+                ),
+                baseHashes,
+            )
+        )
+
+        # The book page comes last, because it links existing pages.
+        bookPage = self.new_project_page(self._mdl.novel, CH_ROOT)
+        bookPage.collect_links(descriptors)
+        writtenPages.extend(
+            pipeline.write(
+                self._get_changed_pages(
+                    [(CH_ROOT, self._mdl.novel, bookPage)],
+                    manifest,
+                    linkedPages,
+                    newPages,
+                    movedPages,
+                    keptPages,
+                    pageDirs,
+                    checkedPages,
+                    baseHashes,
+                ),
+                baseHashes,
+            )
+        )
+        self._register_checked_pages(
+            checkedPages,
+            baseHashes,
+            writtenPages,
+            manifest,
+            linkedPages,
+            keptPages,
+        )
+        self.set_page_links_batch(linkedPages)
+        for page in writtenPages:
+            if page in newPages:
+                counts['created'] += 1
+            else:
+                counts['updated'] += 1
+
+        currentIds = set(elemId for elemId, __, __ in elementPages)
+        currentIds.update(key for key, __, __ in tagPages)
+        currentIds.add(CH_ROOT)
+        for elemId in list(manifest.pages):
+            if elemId in currentIds:
+                continue
+
+            # The element or the tag has been removed from the project.
+            if self._remove_generated_page(manifest, elemId, pageDirs):
+                counts['removed'] += 1
+            else:
+                keptPages.append(manifest.pages[elemId]['path'])
+            del manifest.pages[elemId]
+        self._remove_empty_dirs(pageDirs)
+
+        manifest.write()
+        if counts['removed'] or movedPages:
+            self.prjWiki.update_index()
+        elif writtenPages:
+            self.prjWiki.update_index(
+                [self.prjWiki.get_page_name(page.filePath) for page in writtenPages]
+            )
+        self._ui.set_status(
+            (
+                f'{_("Wiki synchronized")}: '
+                f'{counts["created"]} {_("created")}, '
+                f'{counts["updated"]} {_("updated")}, '
+                f'{len(movedPages)} {_("moved")}, '
+                f'{counts["removed"]} {_("removed")}.'
+            )
+        )
+        if keptPages:
+            self._ui.show_info(
+                _('Some pages have been changed in Zim, so they are neither overwritten nor deleted.'),
+                title=self.windowTitle,
+                detail='\n'.join(keptPages),
+            )
+
+    def update_book_page(self, elemId, oldPageName=None, newPageName=None):
+        """Update the book page's link section for a single element page.
+        
+        Positional arguments:
+            elemId: str -- ID of the element whose page has changed.
+        
+        Optional arguments:
+            oldPageName: str -- Name of a removed or renamed page.
+            newPageName: str -- Name of a created or renamed page.
+
+        The page names are relative to the home namespace.
+            
+        Only the links are updated; the other element pages 
+        are not looked up. Return True if the book page is written.
+        """
+        return self.update_book_page_links(
+            [(elemId, oldPageName, newPageName)]
+        )
+
+    def update_book_page_links(self, changes):
+        """Update the book page's link sections for several element pages.
+        
+        Positional arguments:
+            changes -- list of (element ID, old page name, new page name)
+                       tuples, as passed to update_book_page().
+
+        Only the link lines are changed; text added in Zim is kept.
+        Return True if the book page is written.
+        """
+        changes = [
+            change for change in changes
+            if change[0][:2] in (CHARACTER_PREFIX, LOCATION_PREFIX, ITEM_PREFIX)
+        ]
+        if not changes:
+            return False
+
+        bookPagePath = self.get_wiki_page_link(self._mdl.novel)
+        if bookPagePath is None:
+            return False
+
+        bookPage = self.wikiFactory.new_wiki_page(
+            self._mdl.novel,
+            CH_ROOT,
+            bookPagePath,
+        )
+        try:
+            bookPage.read_links()
+        except (OSError, UnicodeDecodeError):
+            return False
+
+        isChanged = False
+        for elemId, oldPageName, newPageName in changes:
+            if oldPageName is not None:
+                if bookPage.remove_link(elemId, oldPageName):
+                    isChanged = True
+            if newPageName is not None:
+                if bookPage.add_link(elemId, newPageName):
+                    isChanged = True
+        if not isChanged:
+            return False
+
+        manifest = None
+        prjWikiPath = self.get_project_wiki_link()
+        if prjWikiPath is not None:
+            manifest = WikiManifest(os.path.dirname(prjWikiPath))
+            manifest.read()
+            if not manifest.is_unmodified(CH_ROOT):
+                manifest = None
+                # The next synchronization keeps the book page.
+        try:
+            if not bookPage.write_links():
+                return False
+
+        except (OSError, UnicodeDecodeError):
+            return False
+
+        if manifest is not None:
+            # The spliced page is what generating it would produce.
+            manifest.pages[CH_ROOT]['hash'] = manifest.get_file_hash(
+                bookPage.filePath
+            )
+            manifest.write()
+        return True
+
     def zim_is_installed(self):
         """Return True if Zim seems to be installed."""
         if os.path.isfile(self.zimApp):
@@ -611,3 +1271,572 @@ class WikiManager(SubController):
             self.prjWiki.zimApp = self.zimApp
         return True
 
+
+    def _cancel_book_page_update(self, keepChanges=False):
+        """Stop the timer for the book page update, if running.
+        
+        Optional arguments:
+            keepChanges: bool -- If False, discard the pending changes.
+        """
+        if self._bookPageTimerId is not None:
+            self._ui.root.after_cancel(self._bookPageTimerId)
+            self._bookPageTimerId = None
+        if not keepChanges:
+            self._changedPages.clear()
+
+    def _get_changed_pages(
+        self,
+        elementPages,
+        manifest,
+        linkedPages,
+        newPages,
+        movedPages,
+        keptPages,
+        pageDirs,
+        checkedPages,
+        baseHashes,
+    ):
+        """Generate the pages to be written, if their content has changed.
+        
+        Collect the pages without manifest entry in the newPages set,
+        and the pages moved to a new path in the movedPages set.
+        Collect the directories of the removed pages in the pageDirs set.
+        Pages without element, e.g. tag pages, are not linked.
+
+        The pages are not rendered here, but when written. For a page
+        generated before, the manifest's hash is put into baseHashes,
+        so that the page is not written if unchanged, or if modified
+        in Zim. The pages generated are collected in the checkedPages
+        list, to be registered after writing.
+
+        A page file that was not generated for the element 
+        is not overwritten. Its path is added to the keptPages list.
+        If the page path has changed, e.g. with the page layout,
+        the page file is moved.
+        """
+        for elemId, element, page in elementPages:
+            relPath = manifest.get_rel_path(page.filePath)
+            entry = manifest.pages.get(elemId, None)
+            if entry is not None and entry['path'] != relPath:
+                oldPath = manifest.get_abs_path(entry['path'])
+                DIAGNOSTICS.count(DIAGNOSTICS.STAT, 2)
+                if (
+                    os.path.isfile(oldPath)
+                    and not os.path.exists(page.filePath)
+                ):
+                    isUnmodified = manifest.is_unmodified(elemId)
+                    self._move_page(oldPath, page.filePath, pageDirs)
+                    movedPages.add(page)
+                    if not isUnmodified:
+                        # The page has been modified in Zim.
+                        manifest.pages[elemId] = dict(
+                            path=relPath,
+                            hash=entry['hash'],
+                        )
+                        if element is not None:
+                            linkedPages.append((element, page.filePath))
+                        keptPages.append(relPath)
+                        continue
+
+                    baseHashes[page] = entry['hash']
+                    checkedPages.append((elemId, element, page))
+                    yield page
+                    continue
+
+            DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+            adoptedHash = None
+            if os.path.isfile(page.filePath):
+                if entry is not None and entry['path'] == relPath:
+                    baseHashes[page] = entry['hash']
+                else:
+                    adoptedHash = page.get_hash()
+                    if manifest.get_file_hash(page.filePath) != adoptedHash:
+                        # The page file has not been generated for the element.
+                        keptPages.append(relPath)
+                        continue
+
+                    # The page file already has the generated content.
+            elif entry is None:
+                newPages.add(page)
+            if entry is not None and entry['path'] != relPath:
+                # The page name has changed.
+                if not self._remove_generated_page(
+                    manifest,
+                    elemId,
+                    pageDirs,
+                ):
+                    keptPages.append(entry['path'])
+            if adoptedHash is not None:
+                manifest.pages[elemId] = dict(path=relPath, hash=adoptedHash)
+                if element is not None:
+                    linkedPages.append((element, page.filePath))
+                continue
+
+            checkedPages.append((elemId, element, page))
+            yield page
+
+    def _find_page(self, element, elemId, linkPath):
+        """Return the path of the element's page in the project wiki.
+        
+        Try the page name candidates first, then the name of the
+        missing page file. Return None if no page is found.
+        """
+        pageNames = self.pageNameTable.get_page_names(elemId)
+        if not pageNames:
+            pageNames = [element.title]
+        pageNames.append(os.path.splitext(os.path.basename(linkPath))[0])
+        for pageName in pageNames:
+            if pageName:
+                filePath = self.prjWiki.pageIndex.get_path(
+                    pageName,
+                    refresh=False,
+                )
+                if filePath is not None and not self._is_tag_page(filePath):
+                    return filePath
+
+    def _get_existing_files(self, filePaths):
+        """Return the set of the existing files among filePaths.
+        
+        Each directory is listed only once.
+        The file names are compared case-insensitively,
+        if the file system is.
+        """
+        dirFiles = {}
+        existingFiles = set()
+        for filePath in filePaths:
+            dirPath, fileName = os.path.split(filePath)
+            dirKey = os.path.normcase(dirPath)
+            fileNames = dirFiles.get(dirKey, None)
+            if fileNames is None:
+                fileNames = set()
+                DIAGNOSTICS.count(DIAGNOSTICS.LIST)
+                try:
+                    with os.scandir(dirPath or os.curdir) as entries:
+                        for entry in entries:
+                            if entry.is_file():
+                                fileNames.add(os.path.normcase(entry.name))
+                except OSError:
+                    pass
+                dirFiles[dirKey] = fileNames
+            if os.path.normcase(fileName) in fileNames:
+                existingFiles.add(filePath)
+        return existingFiles
+
+    def _get_home_rel_path(self, filePath):
+        """Return the normalized path relative to the home directory.
+        
+        Return None if the file is not below the home directory.
+        """
+        homeDirPrefix = f'{self._norm_path(self.prjWiki.homeDir)}{os.sep}'
+        filePath = self._norm_path(filePath)
+        if filePath.startswith(homeDirPrefix):
+            return filePath[len(homeDirPrefix):]
+
+    def _get_link_paths(self, absPath, relPath):
+        """Return a list of the distinct paths a pair of link fields refer to."""
+        paths = []
+        if absPath is not None:
+            paths.append(absPath)
+        if relPath is not None:
+            relPath = self._ctrl.linkProcessor.expand_path(relPath)
+            if relPath not in paths:
+                paths.append(relPath)
+        return paths
+
+    def _get_linkable_elements(self):
+        """Generate (element ID, element) tuples of all linkable elements."""
+        yield CH_ROOT, self._mdl.novel
+        for source in (
+            self._mdl.novel.plotLines,
+            self._mdl.novel.characters,
+            self._mdl.novel.locations,
+            self._mdl.novel.items,
+        ):
+            for elemId in source:
+                yield elemId, source[elemId]
+
+    def _get_page_link_path(self, element):
+        """Return the path stored in the element's wiki page link fields.
+        
+        Return None if there is no link to a page file.
+        The file is not checked for existence.
+        """
+        wikiPagePath = element.fields.get(ZIM_PAGE_ABS_TAG, None)
+        if wikiPagePath is None:
+            wikiPagePath = element.fields.get(ZIM_PAGE_REL_TAG, None)
+            if wikiPagePath is None:
+                return
+
+            wikiPagePath = self._ctrl.linkProcessor.expand_path(wikiPagePath)
+
+        if wikiPagePath.endswith(ZimPage.EXTENSION):
+            return wikiPagePath
+
+    def _import_page(self, element, elemId, filePath, manifest):
+        """Update the element with the content of the wiki page.
+        
+        Return True if the element is changed.
+        """
+        DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+        try:
+            mtime = os.stat(filePath).st_mtime_ns
+        except OSError:
+            return False
+
+        importState = None
+        if manifest is not None:
+            importState = manifest.imports.get(elemId, None)
+            if (
+                importState is not None
+                and importState['path'] == filePath
+                and importState['mtime'] == mtime
+            ):
+                return False
+
+        DIAGNOSTICS.count(DIAGNOSTICS.READ)
+        with open(filePath, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if manifest is not None:
+            pageHash = manifest.get_hash(text)
+            manifest.imports[elemId] = dict(
+                path=filePath,
+                mtime=mtime,
+                hash=pageHash,
+            )
+            if importState is not None and importState['hash'] == pageHash:
+                return False
+
+            generated = manifest.pages.get(elemId, None)
+            if generated is not None and generated['hash'] == pageHash:
+                return False
+
+        page = self.wikiFactory.new_wiki_page(element, elemId, filePath)
+        page.parse(text)
+        return bool(page.changedAttributes)
+
+    def _is_tag_page(self, filePath):
+        """Return True if filePath is in the project wiki's tag namespace."""
+        return self._norm_path(filePath).startswith(
+            self._norm_path(f'{self.prjWiki.homeDir}/{TAG_NAMESPACE}') + os.sep
+        )
+
+    def _make_namespace_dirs(self, descriptors):
+        """Create the directories of the pages' namespaces, if missing."""
+        namespaces = set(descriptor.namespace for descriptor in descriptors)
+        for namespace in namespaces:
+            if namespace:
+                os.makedirs(
+                    f"{self.prjWiki.homeDir}/{'/'.join(namespace)}",
+                    exist_ok=True,
+                )
+
+    def _map_page_links(self):
+        """Build the map of the page links, and the broken link state.
+        
+        The links to pages below the home directory are checked
+        against the page monitor's page set.
+        """
+        pages = set(
+            self._get_home_rel_path(filePath)
+            for filePath in self.prjWiki.pageMonitor.pages
+        )
+        self._linkedElements = {}
+        self.brokenLinks = set()
+        for elemId, element in self._get_linkable_elements():
+            linkPath = self._get_page_link_path(element)
+            if linkPath is None:
+                continue
+
+            relPath = self._get_home_rel_path(linkPath)
+            if relPath is None:
+                continue
+
+            self._linkedElements.setdefault(relPath, set()).add(elemId)
+            if relPath not in pages:
+                self.brokenLinks.add(elemId)
+
+    def _move_page(self, oldPath, newPath, pageDirs):
+        """Move a page file with its directory of subpages and attachments.
+
+        Add the page's former directory to the pageDirs set,
+        so that it is removed if left empty.
+        """
+        os.replace(oldPath, newPath)
+        oldDir = oldPath[:-len(ZimPage.EXTENSION)]
+        newDir = newPath[:-len(ZimPage.EXTENSION)]
+        if os.path.isdir(oldDir) and not os.path.exists(newDir):
+            os.replace(oldDir, newDir)
+        pageDirs.add(os.path.dirname(oldPath))
+
+    def _new_auto_linker(self, descriptors):
+        """Return an AutoLinker for the element pages, or None.
+
+        Positional arguments:
+            descriptors -- list of PageDescriptor instances,
+                           as returned by PageNameTable.get_descriptors().
+
+        None is returned, if name linking is not enabled for the project.
+        """
+        if not self._mdl.novel.fields.get(ZIM_AUTOLINK_TAG, None):
+            return None
+
+        autoLinker = AutoLinker(ZimNotebook.HOME)
+        autoLinker.build(
+            (self.get_element(descriptor.elemId), descriptor)
+            for descriptor in descriptors
+        )
+        return autoLinker
+
+    def _new_element_pages(self, descriptors):
+        """Return a list of (element ID, element, page) tuples.
+        
+        Positional arguments:
+            descriptors -- list of PageDescriptor instances,
+                           as returned by PageNameTable.get_descriptors().
+        """
+        elementPages = []
+        autoLinker = self._new_auto_linker(descriptors)
+        for descriptor in descriptors:
+            element = self.get_element(descriptor.elemId)
+            page = self.new_project_page(
+                element,
+                descriptor.elemId,
+                descriptor,
+            )
+            page.autoLinker = autoLinker
+            elementPages.append((descriptor.elemId, element, page))
+        return elementPages
+
+    def _new_tag_pages(self, descriptors, elementPages):
+        """Return a list of (manifest key, None, page) tuples.
+
+        Positional arguments:
+            descriptors -- list of PageDescriptor instances,
+                           as returned by PageNameTable.get_descriptors().
+            elementPages -- list of (element ID, element, page) tuples,
+                            as returned by _new_element_pages().
+
+        The pages are the tag pages and the tag overview page,
+        generated from an inverted index of the elements' tags.
+        """
+        tagIndex = TagIndex()
+        tagIndex.build(
+            (element, descriptor)
+            for descriptor, (__, element, __) in zip(descriptors, elementPages)
+        )
+        tagPages = tagIndex.new_pages(self.prjWiki.homeDir, self.prjWiki.HOME)
+        if tagPages:
+            os.makedirs(
+                f'{self.prjWiki.homeDir}/{TAG_NAMESPACE}',
+                exist_ok=True,
+            )
+        return [(key, None, page) for key, page in tagPages]
+
+    def _norm_path(self, filePath):
+        """Return filePath normalized for comparison."""
+        return os.path.normcase(os.path.normpath(filePath))
+
+    def _on_indexed(self, success, message):
+        """Callback function for the index scheduler."""
+        if success:
+            if self.brokenLinks:
+                # Keep the broken link warning visible.
+                return
+
+            self._ui.set_status(f"#{_('Wiki index updated')}.")
+        else:
+            self._ui.set_status(
+                f"!{_('Wiki index update failed')}: {message}"
+            )
+
+    def _on_pages_changed(self, created, deleted):
+        """Callback function for the project wiki's page monitor.
+        
+        Update the broken link state for the pages created or deleted
+        below the home directory. The elements linked to the changed
+        pages are looked up in the map of the page links, which is
+        built again only if the links have changed.
+        No page file is looked up here.
+
+        The book page's link sections are updated when no more changes
+        have been reported for BOOK_PAGE_DELAY milliseconds, so that
+        a series of changes results in a single write.
+        """
+        if self.prjWiki is None or self.prjWiki.pageMonitor is None:
+            return
+
+        oldBrokenLinks = self.brokenLinks or set()
+        if self._linkedElements is None or self.brokenLinks is None:
+            self._map_page_links()
+        else:
+            pages = self.prjWiki.pageMonitor.pages
+            for filePaths in (created, deleted):
+                for filePath in filePaths:
+                    elemIds = self._linkedElements.get(
+                        self._get_home_rel_path(filePath),
+                        None,
+                    )
+                    if elemIds is None:
+                        continue
+
+                    if filePath in pages:
+                        self.brokenLinks -= elemIds
+                    else:
+                        self.brokenLinks |= elemIds
+        if self.brokenLinks - oldBrokenLinks:
+            self._ui.set_status(
+                f"!{_('Broken wiki links')}: {len(self.brokenLinks)}"
+            )
+        self._changedPages.update(created)
+        self._changedPages.update(deleted)
+        self._cancel_book_page_update(keepChanges=True)
+        self._bookPageTimerId = self._ui.root.after(
+            self.BOOK_PAGE_DELAY,
+            self._update_book_page_links,
+        )
+
+    def _register_pages(self, elementPages, manifest, linkedPages):
+        """Add the written pages to the manifest.
+        
+        The hashes are those of the content actually written.
+        Pages without element, e.g. tag pages, are not linked.
+        """
+        for elemId, element, page in elementPages:
+            manifest.pages[elemId] = dict(
+                path=manifest.get_rel_path(page.filePath),
+                hash=page.contentHash,
+            )
+            if element is not None:
+                linkedPages.append((element, page.filePath))
+
+    def _register_checked_pages(
+        self,
+        checkedPages,
+        baseHashes,
+        writtenPages,
+        manifest,
+        linkedPages,
+        keptPages,
+    ):
+        """Add the pages passed for writing to the manifest.
+        
+        The hashes are those of the content rendered when writing.
+        A page not written, although its content differs from the
+        base hash, has been modified in Zim; its manifest entry
+        is left as it is, and its path is added to keptPages.
+        """
+        writtenPages = set(writtenPages)
+        for elemId, element, page in checkedPages:
+            relPath = manifest.get_rel_path(page.filePath)
+            baseHash = baseHashes.get(page, None)
+            if (
+                page not in writtenPages
+                and baseHash is not None
+                and page.contentHash != baseHash
+            ):
+                keptPages.append(relPath)
+                manifest.pages[elemId] = dict(path=relPath, hash=baseHash)
+                continue
+
+            manifest.pages[elemId] = dict(path=relPath, hash=page.contentHash)
+            if element is not None:
+                linkedPages.append((element, page.filePath))
+
+    def _remove_empty_dirs(self, dirPaths):
+        """Remove the namespace directories left empty, bottom up.
+
+        This is done after all pages are written, so that no directory
+        is removed while a new page is about to be written into it.
+        """
+        for dirPath in sorted(dirPaths, reverse=True):
+            while dirPath.startswith(f'{self.prjWiki.homeDir}/'):
+                try:
+                    os.rmdir(dirPath)
+                except OSError:
+                    break
+
+                dirPath = os.path.dirname(dirPath)
+
+    def _remove_generated_page(self, manifest, elemId, pageDirs):
+        """Delete the element's generated page file, if unmodified.
+        
+        Add the page's directory to the pageDirs set,
+        if the page file is removed.
+        Return True if the page is removed or already missing.
+        """
+        filePath = manifest.get_abs_path(manifest.pages[elemId]['path'])
+        if not os.path.isfile(filePath):
+            return True
+
+        if not manifest.is_unmodified(elemId):
+            return False
+
+        os.remove(filePath)
+        pageDirs.add(os.path.dirname(filePath))
+        return True
+
+    def _update_book_page_links(self):
+        """Update the book page's links to the pages created or deleted in Zim.
+        
+        Callback function for the timer started on page changes.
+        The book page links the generated element pages only,
+        so the other pages are ignored. 
+        """
+        self._bookPageTimerId = None
+        changedPages = self._changedPages
+        self._changedPages = set()
+        if self.prjWiki is None or self.prjWiki.pageMonitor is None:
+            return
+
+        self.pageNameTable.refresh()
+        descriptors = {}
+        # key: normalized page file path relative to the home directory
+        # value: PageDescriptor instance
+        for descriptor in self.pageNameTable.get_descriptors():
+            if descriptor.fileName is not None:
+                descriptors[
+                    self._norm_path(descriptor.get_rel_path())
+                ] = descriptor
+        pages = self.prjWiki.pageMonitor.pages
+        changes = []
+        for filePath in changedPages:
+            descriptor = descriptors.get(
+                self._get_home_rel_path(filePath),
+                None,
+            )
+            if descriptor is None:
+                continue
+
+            pageName = descriptor.get_link()
+            if filePath in pages:
+                changes.append((descriptor.elemId, None, pageName))
+            else:
+                changes.append((descriptor.elemId, pageName, None))
+        if self.update_book_page_links(changes):
+            self.prjWiki.update_index(
+                [
+                    self.prjWiki.get_page_name(
+                        self.get_wiki_page_link(self._mdl.novel)
+                    )
+                ]
+            )
+
+    def _update_page_link_fields(self, element, wikiPagePath):
+        """Set the element's wiki page link fields.
+        
+        Return a status message, or None if nothing has changed.
+        """
+        fields = element.fields
+        initialAbsPath = fields.get(ZIM_PAGE_ABS_TAG, None)
+        initialRelPath = fields.get(ZIM_PAGE_REL_TAG, None)
+        fields[ZIM_PAGE_ABS_TAG] = wikiPagePath
+        relPath = self._ctrl.linkProcessor.shorten_path(wikiPagePath)
+        fields[ZIM_PAGE_REL_TAG] = relPath
+        element.fields = fields
+        self._linkedElements = None
+        # The page link map is built again on the next page change.
+        if initialAbsPath is None or initialRelPath is None:
+            return f"#{_('Wiki link created')}."
+
+        if initialAbsPath != wikiPagePath  or initialRelPath != relPath:
+            return f"#{_('Broken link fixed')}."
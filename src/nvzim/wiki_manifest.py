@@ -0,0 +1,97 @@
+"""Provide a class for a manifest of generated wiki pages.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import json
+import os
+
+
+class WikiManifest:
+    """Keep track of the pages generated for the novel's elements.
+
+    For each element ID, the page path relative to the notebook
+    directory and the hash of the generated page content are stored.
+    Also, the state of the pages imported into the novel is stored.
+    """
+    FILENAME = '.nv_zim_manifest.json'
+    VERSION = 1
+
+    def __init__(self, dirPath):
+        """Set up an empty manifest.
+
+        Positional arguments:
+            dirPath: str -- Path to the notebook directory.
+        """
+        self.dirPath = dirPath
+        self.filePath = f'{dirPath}/{self.FILENAME}'
+        self.pages = {}
+        # key: element ID
+        # value: dict(path=relative page path, hash=content hash)
+        self.imports = {}
+        # key: element ID
+        # value: dict(path=page path, mtime=modification time, hash=content hash)
+        # as of the last import from the wiki
+
+    def get_abs_path(self, relPath):
+        """Return the absolute path of a page, given as relative path."""
+        return f'{self.dirPath}/{relPath}'
+
+    @staticmethod
+    def get_file_hash(filePath):
+        """Return the content hash of an existing page file, or None."""
+        try:
+            with open(filePath, 'r', encoding='utf-8') as f:
+                return WikiManifest.get_hash(f.read())
+
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    @staticmethod
+    def get_hash(text):
+        """Return the content hash of the page text."""
+        import hashlib
+        # deferred; after the first call, this is a module cache lookup
+
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get_rel_path(self, filePath):
+        """Return the page path relative to the notebook directory."""
+        return os.path.relpath(filePath, self.dirPath).replace('\\', '/')
+
+    def is_unmodified(self, elemId):
+        """Return True if the element's page is as generated."""
+        entry = self.pages.get(elemId, None)
+        if entry is None:
+            return False
+
+        return self.get_file_hash(
+            self.get_abs_path(entry['path'])
+        ) == entry['hash']
+
+    def read(self):
+        """Read the manifest file, if any."""
+        try:
+            with open(self.filePath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION:
+                return
+
+            self.pages = data['pages']
+            self.imports = data.get('imports', {})
+        except (OSError, ValueError, KeyError, AttributeError):
+            self.pages = {}
+            self.imports = {}
+
+    def write(self):
+        """Write the manifest file."""
+        data = {
+            'version': self.VERSION,
+            'pages': self.pages,
+            'imports': self.imports,
+        }
+        tempPath = f'{self.filePath}.tmp'
+        with open(tempPath, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tempPath, self.filePath)
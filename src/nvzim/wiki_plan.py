@@ -0,0 +1,135 @@
+"""Provide a class for the plan of a project wiki generation.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import os
+
+from nvzim.nvzim_locale import _
+from nvzim.zim_page import ZimPage
+
+
+class WikiPlan:
+    """What generating the project wiki would do to the existing notebook.
+
+    Creating the project wiki moves an existing notebook to a backup,
+    and writes every page anew. So all pages are written, and the
+    comparison with the current notebook only tells which pages differ.
+    The page file paths are relative to the home directory.
+    """
+    MAX_LISTED = 20
+    # maximum number of entries listed per category in the summary
+
+    def __init__(self, homeDir):
+        """Set up an empty plan.
+
+        Positional arguments:
+            homeDir: str -- Path to the home directory of the notebook.
+        """
+        self.homeDir = homeDir
+        self.created = []
+        # paths of the pages missing in the current notebook
+        self.updated = []
+        # paths of the pages differing from the current notebook
+        self.unchanged = []
+        # paths of the pages identical with the current notebook
+        self.orphaned = []
+        # paths of the existing pages that are not generated,
+        # i.e. only kept in the backup
+        self.collisions = []
+        # (page name, list of element IDs) tuples, as returned by
+        # PageNameTable.get_collisions()
+        self.bytesToWrite = 0
+        # total size of the pages to be written, i.e. of all pages
+        self.totalBytes = 0
+        # total size of all generated pages
+
+    def add_page(self, relPath, comparison):
+        """Add a generated page to the plan.
+
+        Positional arguments:
+            relPath: str -- Page file path, relative to the home directory.
+            comparison -- tuple, as returned by ZimPage.compare().
+        """
+        fileExists, isUnchanged, textSize = comparison
+        self.totalBytes += textSize
+        self.bytesToWrite += textSize
+        if isUnchanged:
+            self.unchanged.append(relPath)
+        elif fileExists:
+            self.updated.append(relPath)
+        else:
+            self.created.append(relPath)
+
+    def find_orphans(self):
+        """Collect the existing pages that are not in the plan.
+
+        Hidden files and directories are skipped.
+        """
+        plannedPages = set(self.created)
+        plannedPages.update(self.updated)
+        plannedPages.update(self.unchanged)
+        self.orphaned = []
+        pending = ['']
+        while pending:
+            relDir = pending.pop()
+            try:
+                with os.scandir(f'{self.homeDir}/{relDir}') as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+
+                        relPath = f'{relDir}{entry.name}'
+                        if entry.is_dir():
+                            pending.append(f'{relPath}/')
+                        elif (
+                            entry.name.endswith(ZimPage.EXTENSION)
+                            and relPath not in plannedPages
+                        ):
+                            self.orphaned.append(relPath)
+            except OSError:
+                pass
+        self.orphaned.sort()
+
+    def get_summary(self):
+        """Return a list of text lines describing the plan."""
+        pageCount = (
+            len(self.created) + len(self.updated) + len(self.unchanged)
+        )
+        lines = [
+            f'{_("Pages to write")}: {pageCount}',
+            f'{_("Bytes to write")}: {self.bytesToWrite}',
+            (
+                f'{_("Pages differing from the current notebook")}: '
+                f'{len(self.created) + len(self.updated)}'
+            ),
+            f'{_("New pages")}: {len(self.created)}',
+            f'{_("Changed pages")}: {len(self.updated)}',
+            f'{_("Unchanged pages")}: {len(self.unchanged)}',
+            (
+                f'{_("Orphaned pages, moved to the backup")}: '
+                f'{len(self.orphaned)}'
+            ),
+            f'{_("Page name collisions")}: {len(self.collisions)}',
+        ]
+        for heading, entries in (
+            (_('Changed pages'), self.updated),
+            (_('Orphaned pages, moved to the backup'), self.orphaned),
+            (
+                _('Page name collisions'),
+                [
+                    f'{pageName}: {", ".join(elemIds)}'
+                    for pageName, elemIds in self.collisions
+                ],
+            ),
+        ):
+            if not entries:
+                continue
+
+            lines.append('')
+            lines.append(f'{heading}:')
+            lines.extend(entries[:self.MAX_LISTED])
+            if len(entries) > self.MAX_LISTED:
+                lines.append(f'... ({len(entries) - self.MAX_LISTED} {_("more")})')
+        return lines
@@ -4,29 +4,147 @@ Copyright (c) 2025 Peter Triesberger
 For further information see https://github.com/peter88213/nv_zim
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
-import re
-
 from nvzim.zim_page import ZimPage
+from nvzim.zim_tokenizer import normalize_tag
 
 
 class WorldElementPage(ZimPage):
+    __slots__ = (
+        'changedAttributes',
+        '_preamble',
+        '_tags',
+        '_tagLineNumbers',
+        '_sections',
+        '_section',
+    )
+
+    def __init__(self, filePath, element):
+        super().__init__(filePath, element)
+        self.changedAttributes = []
+        self._preamble = []
+        self._tags = []
+        self._tagLineNumbers = []
+        self._sections = {}
+        self._section = None
+
+    def body(self, text):
+        """Parser callback method for a note's body text line.
+        
+        Overrides the superclass method.
+        """
+        if self._section is not None:
+            self._section.append(text)
+
+    def end(self):
+        """Parser callback method for the end of the note.
+        
+        Update the element with the parsed data.
+        Overrides the superclass method.
+        """
+        akaLines, tags, descLines = self._split_preamble()
+        self._import_text('aka', akaLines)
+        self._import_tags(tags)
+        self._import_text('desc', descLines)
+
+    def h1(self, heading):
+        """Parser callback method for a note's first level heading.
+        
+        Extends the superclass method.
+        """
+        super().h1(heading)
+        self._section = self._preamble
+
+    def h2(self, heading):
+        """Parser callback method for a note's second level heading.
+        
+        Overrides the superclass method.
+        """
+        self._section = []
+        self._sections[heading] = self._section
 
-    def fill_page(self, lines):
-        """Add page content to the lines.
+    def iter_content(self):
+        """Generate the page content lines.
         
         Overrides the superclass method.
         """
         if self.element.aka:
-            lines.append(self.element.aka)
-            lines.append('\n')
+            yield self.element.aka
+            yield '\n'
 
         if self.element.tags:
             for tag in self.element.tags:
-                tag = re.sub(r'\W+', '_', tag)
-                # replacing non-alphanumeric characters with underscores
-                lines.append(f"@{tag}")
-            lines.append('\n')
+                yield f"@{normalize_tag(tag)}"
+            yield '\n'
 
         if self.element.desc:
-            lines.append(self.element.desc)
-            lines.append('\n')
+            yield self.link_names(self.element.desc)
+            yield '\n'
+
+    def start(self):
+        """Parser callback method for the start of the note.
+        
+        Overrides the superclass method.
+        """
+        self.changedAttributes = []
+        self._preamble = []
+        self._tags = []
+        self._tagLineNumbers = []
+        self._sections = {}
+        self._section = None
+
+    def tags(self, tags):
+        """Parser callback method for a line of tags.
+        
+        Overrides the superclass method.
+        """
+        if self._section is self._preamble:
+            self._tagLineNumbers.append(len(self._preamble))
+            self._tags.extend(tags)
+
+    def _import_tags(self, tags):
+        """Set the element's tags, keeping the spelling of known tags."""
+        knownTags = {}
+        for tag in self.element.tags or []:
+            knownTags[normalize_tag(tag)] = tag
+        newTags = [knownTags.get(tag, tag) for tag in tags]
+        if newTags == list(self.element.tags or []):
+            return
+
+        self.element.tags = newTags or None
+        self.changedAttributes.append('tags')
+
+    def _import_text(self, attribute, lines):
+        """Set the element's text attribute, if changed."""
+        text = '\n'.join(lines).strip('\n')
+        if not text:
+            text = None
+        if text == (getattr(self.element, attribute) or None):
+            return
+
+        setattr(self.element, attribute, text)
+        self.changedAttributes.append(attribute)
+
+    def _split_preamble(self):
+        """Return the lines before the first subheading, split up.
+        
+        Return a tuple: aka lines, tags, description lines.
+        The aka is what precedes the tags. Without tags,
+        the first paragraph is taken as aka if the element has one.
+        """
+        if self._tagLineNumbers:
+            return (
+                self._preamble[:self._tagLineNumbers[0]],
+                self._tags,
+                self._preamble[self._tagLineNumbers[-1]:],
+            )
+
+        if not self.element.aka:
+            return [], [], self._preamble
+
+        lines = self._preamble[:]
+        while lines and not lines[0].strip():
+            del lines[0]
+        i = 0
+        while i < len(lines) and lines[i].strip():
+            i += 1
+        return lines[:i], [], lines[i:]
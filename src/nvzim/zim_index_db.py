@@ -0,0 +1,194 @@
+"""Provide a class for read-only access to Zim's own page index.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from contextlib import closing
+import os
+
+from nvzim.zim_page import ZimPage
+
+
+class ZimIndexDb:
+    """Resolve pages through the SQLite index in the notebook cache.
+
+    Zim keeps the index in the ".zim" cache directory of the notebook.
+    The database is opened read-only, once per lookup.
+    The lookups return None if the index is missing or cannot
+    be read, so that the caller can fall back to the file system.
+    Whether the index is up to date is for the caller to decide,
+    comparing get_mtime() with the notebook's directories.
+    """
+    INDEX_PATH = '.zim/index.db'
+
+    _FULL_NAMES = (
+        'WITH RECURSIVE fullNames(id, fullName) AS ('
+        'SELECT id, basename FROM pages '
+        "WHERE parent IN (SELECT id FROM pages WHERE basename = '') "
+        "AND basename != '' "
+        'UNION ALL '
+        "SELECT pages.id, fullNames.fullName || ':' || pages.basename "
+        'FROM pages JOIN fullNames ON pages.parent = fullNames.id '
+        'WHERE substr(:fullName, 1, length(fullNames.fullName) + 1) '
+        "= fullNames.fullName || ':' COLLATE NOCASE"
+        ') '
+    )
+    # Common table expression with the full names along the path
+    # of the :fullName parameter; the other branches are not visited.
+
+    def __init__(self, dirPath):
+        """Positional arguments:
+            dirPath: str -- Path to the notebook directory.
+        """
+        self.dirPath = dirPath
+        self.filePath = f'{dirPath}/{self.INDEX_PATH}'
+
+    def find_pages(self, pageName, namespace=None):
+        """Return a list of the full names of the pages named pageName.
+
+        Positional arguments:
+            pageName: str -- Page basename, not case sensitive.
+
+        Optional arguments:
+            namespace: str -- Restrict the search to this namespace.
+
+        The pages are sorted by depth.
+        The full names are built from the ancestors' basenames
+        within the same query.
+        """
+        rows = self._query(
+            (
+                'WITH RECURSIVE names(page, parent, fullName, depth) AS ('
+                'SELECT id, parent, basename, 0 FROM pages '
+                'WHERE basename = ? COLLATE NOCASE '
+                'AND is_link_placeholder = 0 '
+                'UNION ALL '
+                "SELECT names.page, pages.parent, pages.basename || ':' "
+                '|| names.fullName, names.depth + 1 '
+                'FROM pages JOIN names ON pages.id = names.parent '
+                "WHERE pages.basename != ''"
+                ') '
+                'SELECT fullName, MAX(depth) FROM names GROUP BY page'
+            ),
+            (self._get_key(pageName),),
+        )
+        # With MAX(), SQLite takes fullName from the row of the root's child.
+        if rows is None:
+            return None
+
+        fullNames = [
+            fullName for fullName, __ in rows
+            if namespace is None or fullName.startswith(f'{namespace}:')
+        ]
+        fullNames.sort(key=lambda name: name.count(':'))
+        return fullNames
+
+    def get_backlinks(self, fullName):
+        """Return a sorted list of the full names of pages linking to a page.
+
+        Positional arguments:
+            fullName: str -- Full page name, not case sensitive.
+        """
+        rows = self._query(
+            (
+                f'{self._FULL_NAMES}, '
+                'names(page, parent, fullName, depth) AS ('
+                'SELECT DISTINCT pages.id, pages.parent, pages.basename, 0 '
+                'FROM pages JOIN links ON pages.id = links.source '
+                'WHERE links.target IN (SELECT id FROM fullNames '
+                'WHERE fullName = :fullName COLLATE NOCASE) '
+                'UNION ALL '
+                "SELECT names.page, pages.parent, pages.basename || ':' "
+                '|| names.fullName, names.depth + 1 '
+                'FROM pages JOIN names ON pages.id = names.parent '
+                "WHERE pages.basename != ''"
+                ') '
+                'SELECT fullName, MAX(depth) FROM names GROUP BY page'
+            ),
+            dict(fullName=self._get_key(fullName)),
+        )
+        if rows is None:
+            return None
+
+        return sorted(sourceName for sourceName, __ in rows)
+
+    def get_file_path(self, fullName):
+        """Return the path of the page file of a full page name."""
+        relPath = fullName.replace(':', '/').replace(' ', '_')
+        return f'{self.dirPath}/{relPath}{ZimPage.EXTENSION}'
+
+    def get_full_name(self, fullName):
+        """Return the full page name as indexed, or None if not found.
+
+        Positional arguments:
+            fullName: str -- Full page name, not case sensitive.
+        """
+        rows = self._query(
+            (
+                f'{self._FULL_NAMES}'
+                'SELECT fullName FROM fullNames '
+                'WHERE fullName = :fullName COLLATE NOCASE'
+            ),
+            dict(fullName=self._get_key(fullName)),
+        )
+        if rows:
+            return rows[0][0]
+
+    def get_mtime(self):
+        """Return the modification time of the index in ns, or None."""
+        try:
+            return os.stat(self.filePath).st_mtime_ns
+
+        except OSError:
+            return None
+
+    def get_namespace_pages(self, namespace):
+        """Return a list of the full names of a namespace's child pages.
+
+        Positional arguments:
+            namespace: str -- Full name of the parent page, 
+                              not case sensitive.
+
+        The pages are in Zim's sort order.
+        """
+        rows = self._query(
+            (
+                f'{self._FULL_NAMES}'
+                'SELECT fullNames.fullName, pages.basename FROM pages '
+                'JOIN fullNames ON pages.parent = fullNames.id '
+                'WHERE fullNames.fullName = :fullName COLLATE NOCASE '
+                'AND pages.is_link_placeholder = 0 '
+                'ORDER BY pages.sortkey'
+            ),
+            dict(fullName=self._get_key(namespace)),
+        )
+        if rows is None:
+            return None
+
+        return [f'{parentName}:{basename}' for parentName, basename in rows]
+
+    def is_available(self):
+        """Return True if the notebook has an index database."""
+        return os.path.isfile(self.filePath)
+
+    def _get_key(self, fullName):
+        """Return fullName as stored in the index."""
+        return fullName.replace('_', ' ')
+
+    def _query(self, sql, parameters):
+        """Return a list of result rows, or None in case of error."""
+        if not self.is_available():
+            return None
+
+        from pathlib import Path
+        import sqlite3
+        # deferred, because the index is not needed at start-up
+
+        uri = f'{Path(os.path.abspath(self.filePath)).as_uri()}?mode=ro'
+        try:
+            with closing(sqlite3.connect(uri, uri=True)) as connection:
+                return connection.execute(sql, parameters).fetchall()
+
+        except sqlite3.Error:
+            return None
@@ -0,0 +1,75 @@
+"""Provide a class for starting Zim processes.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import subprocess
+import time
+
+from nvzim.diagnostics import DIAGNOSTICS
+
+
+class ZimLauncher:
+    """Start Zim, keeping track of the started processes.
+
+    Zim has no stable interface for remote control. However, a Zim
+    process started while another instance is running hands its
+    command line over to the running instance, and terminates.
+    So each request still starts a process, but the launcher
+    - reaps the terminated processes, so that no zombies pile up,
+    - ignores a request that repeats the previous one at once,
+    - measures the launch latency.
+    """
+    REPEAT_INTERVAL = 1.0
+    # seconds within which a repeated request is ignored
+
+    def __init__(self):
+        self.launches = 0
+        self.lastLatency = None
+        self.totalLatency = 0.0
+        # seconds spent for starting processes
+        self._processes = []
+        self._lastCommand = None
+        self._lastTime = None
+
+    def is_running(self):
+        """Return True if a started process is still running."""
+        self.reap()
+        return bool(self._processes)
+
+    def launch(self, command):
+        """Start a process; return True if started.
+
+        Positional arguments:
+            command -- list: Zim executable path and arguments.
+
+        Return False if the request is a repetition.
+        Raise OSError if the process cannot be started.
+        """
+        self.reap()
+        now = time.monotonic()
+        if (
+            command == self._lastCommand
+            and now - self._lastTime < self.REPEAT_INTERVAL
+        ):
+            return False
+
+        start = time.perf_counter()
+        with DIAGNOSTICS.measure('ZimLauncher.launch'):
+            process = subprocess.Popen(command)
+            DIAGNOSTICS.count(DIAGNOSTICS.SPAWN)
+        self.lastLatency = time.perf_counter() - start
+        self.totalLatency += self.lastLatency
+        self.launches += 1
+        self._processes.append(process)
+        self._lastCommand = list(command)
+        self._lastTime = now
+        return True
+
+    def reap(self):
+        """Forget the terminated processes, collecting their exit status."""
+        self._processes = [
+            process for process in self._processes
+            if process.poll() is None
+        ]
@@ -5,24 +5,44 @@ For further information see https://github.com/peter88213/nv_zim
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
 from configparser import ConfigParser
-import glob
 import os
-import subprocess
 
-from nvzim.nvzim_locale import _
-from nvzim.zim_page import ZimPage
+from nvzim.diagnostics import DIAGNOSTICS
+from nvzim.index_scheduler import IndexScheduler
+from nvzim.nvzim_locale import N_
+from nvzim.page_index import PageIndex
+from nvzim.page_monitor import PageMonitor
+from nvzim.zim_index_db import ZimIndexDb
+from nvzim.zim_launcher import ZimLauncher
 
 
 class ZimNotebook:
 
-    DESCRIPTION = _('Zim notebook')
+    DESCRIPTION = N_('Zim notebook')
     EXTENSION = '.zim'
 
     NOTEBOOK = 'Notebook'
     HOME = 'Home'
 
-    def __init__(self, zimApp, dirPath='', filePath='', wikiName=None):
+    def __init__(
+        self,
+        zimApp,
+        dirPath='',
+        filePath='',
+        wikiName=None,
+        tkRoot=None,
+        on_indexed=None,
+        launcher=None,
+    ):
         self.zimApp = zimApp
+        if launcher is None:
+            launcher = ZimLauncher()
+        self.launcher = launcher
+        self.tkRoot = tkRoot
+        self.on_indexed = on_indexed
+        self.indexScheduler = None
+        self.pageMonitor = None
+        self.on_pages_changed = None
 
         # Specify either directory or file path.
         if wikiName is None:
@@ -54,6 +74,104 @@ class ZimNotebook:
         else:
             raise AttributeError
 
+        self.pageIndex = PageIndex(
+            self.homeDir,
+            f'{self.dirPath}/{PageIndex.FILENAME}',
+        )
+        self.zimIndex = ZimIndexDb(self.dirPath)
+
+    def close(self):
+        """Stop monitoring, and discard pending index updates."""
+        self.stop_monitor()
+        if self.indexScheduler is not None:
+            self.indexScheduler.cancel()
+
+    def find_page_name(self, filePath):
+        """Return the Zim page name of a page file in the notebook, or None.
+        
+        Positional arguments:
+            filePath: str -- Path to the page file.
+
+        If Zim's index is up to date, the page name is taken from there;
+        otherwise, it is derived from the path. 
+        Return None if the file is not in the notebook's home directory.
+        """
+        filePath = os.path.normpath(filePath)
+        if not filePath.startswith(
+            f'{os.path.normpath(self.homeDir)}{os.sep}'
+        ):
+            return None
+
+        pageName = self.get_page_name(filePath)
+        if self._is_zim_index_current():
+            fullName = self.zimIndex.get_full_name(pageName)
+            if fullName is not None:
+                return fullName
+
+        return pageName
+
+    def get_backlinks(self, filePath):
+        """Return a list of the paths of the pages linking to a page file.
+
+        Return None if Zim's index is not available or not up to date.
+        """
+        if not self._is_zim_index_current():
+            return None
+
+        fullNames = self.zimIndex.get_backlinks(self.get_page_name(filePath))
+        if fullNames is None:
+            return None
+
+        return [self.zimIndex.get_file_path(name) for name in fullNames]
+
+    def get_namespace_pages(self, filePath):
+        """Return a list of the paths of a page file's child pages.
+
+        Return None if Zim's index is not available or not up to date.
+        """
+        if not self._is_zim_index_current():
+            return None
+
+        fullNames = self.zimIndex.get_namespace_pages(
+            self.get_page_name(filePath)
+        )
+        if fullNames is None:
+            return None
+
+        return [self.zimIndex.get_file_path(name) for name in fullNames]
+
+    def get_page_name(self, filePath):
+        """Return the Zim page name of the page file specified by filePath."""
+        relPath = os.path.relpath(
+            os.path.splitext(filePath)[0],
+            self.dirPath,
+        )
+        return relPath.replace('\\', '/').replace('/', ':')
+
+    @DIAGNOSTICS.timed('ZimNotebook.get_page_path_by_name')
+    def get_page_path_by_name(self, pageName):
+        """Return the path of a note specified by page name.
+        
+        Ask Zim's own index first. If it is missing or older than the
+        newest directory in the home tree, look up the page in the 
+        notebook's page index instead.
+        """
+        if self._is_zim_index_current():
+            fullNames = self.zimIndex.find_pages(
+                pageName,
+                namespace=self.settings['home'],
+            )
+            if fullNames == []:
+                return None
+
+            for fullName in fullNames or []:
+                filePath = self.zimIndex.get_file_path(fullName)
+                DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+                if os.path.isfile(filePath):
+                    return filePath
+
+        return self.pageIndex.get_path(pageName)
+
     def open(self, initialPage=None):
         if not os.path.isfile(self.filePath):
             return
@@ -64,7 +182,7 @@ class ZimNotebook:
         ]
         if initialPage is not None:
             wikiStart.append(initialPage)
-        subprocess.Popen(wikiStart)
+        self.launcher.launch(wikiStart)
 
     def read_settings(self):
         """Read the settings, updating the instance variable."""
@@ -73,17 +191,48 @@ class ZimNotebook:
         for tag in self.settings:
             self.settings[tag] = notebook.get(self.NOTEBOOK, tag)
 
-    def update_index(self):
+    def start_monitor(self, on_change=None):
+        """Keep the page index up to date in the background.
+        
+        Optional arguments:
+            on_change -- callback function taking two arguments:
+                         created: set, deleted: set of page file paths.
+        """
+        if self.tkRoot is None:
+            return
+
+        self.stop_monitor()
+        self.on_pages_changed = on_change
+        self.pageMonitor = PageMonitor(
+            self.homeDir,
+            self.tkRoot,
+            self._on_pages_changed,
+        )
+        self.pageMonitor.start()
+
+    def stop_monitor(self):
+        if self.pageMonitor is not None:
+            self.pageMonitor.stop()
+            self.pageMonitor = None
+
+    def update_index(self, pages=None):
+        """Request an index update.
+        
+        Optional arguments:
+            pages -- list of changed Zim page names; if None, index all.
+        """
         if not os.path.isfile(self.filePath):
             return
 
-        subprocess.Popen(
-            [
+        if self.indexScheduler is None:
+            self.indexScheduler = IndexScheduler(
                 self.zimApp,
-                '--index',
                 self.filePath,
-            ]
-        )
+                tkRoot=self.tkRoot,
+                on_done=self.on_indexed,
+            )
+        self.indexScheduler.zimApp = self.zimApp
+        self.indexScheduler.request(pages)
 
     def write(self):
         """Write the notebook, overwriting existing one."""
@@ -95,17 +244,16 @@ class ZimNotebook:
             notebook.write(f)
         os.makedirs(self.homeDir, exist_ok=True)
 
-    def get_page_path_by_name(self, pageName):
-        """Return the path of a note specified by page name."""
-        workdir = os.getcwd()
-        os.chdir(self.homeDir)
-        # setting the root directory for glob in Python prior to version 3.10
-        foundFiles = glob.glob(
-            f"**/{pageName.replace(' ', '_')}{ZimPage.EXTENSION}",
-            recursive=True,
-        )
-        os.chdir(workdir)
-        if foundFiles:
-            foundFile = foundFiles[0].replace('\\', '/')
-            return f'{self.homeDir}/{foundFile}'
+    def _is_zim_index_current(self):
+        """Return True if Zim's index is newer than the home tree."""
+        indexMtime = self.zimIndex.get_mtime()
+        if indexMtime is None:
+            return False
+
+        return indexMtime >= self.pageIndex.get_mtime()
 
+    def _on_pages_changed(self, created, deleted):
+        """Callback function for the page monitor."""
+        self.pageIndex.update_pages(created, deleted)
+        if self.on_pages_changed is not None:
+            self.on_pages_changed(created, deleted)
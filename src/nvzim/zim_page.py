@@ -4,47 +4,89 @@ Copyright (c) 2025 Peter Triesberger
 For further information see https://github.com/peter88213/nv_zim
 License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
 """
+import os
 import re
 
+from nvzim.diagnostics import DIAGNOSTICS
 from nvzim.nvzim_globals import StopParsing
+from nvzim.nvzim_locale import N_
 from nvzim.nvzim_locale import _
+from nvzim.page_descriptor import PageDescriptor
+from nvzim.zim_tokenizer import BODY
+from nvzim.zim_tokenizer import HEADING
+from nvzim.zim_tokenizer import LINK
+from nvzim.zim_tokenizer import TAGS
+from nvzim.zim_tokenizer import strip_formatting
+from nvzim.zim_tokenizer import tokenize
 
 
 class ZimPage:
+    __slots__ = (
+        'filePath',
+        'element',
+        'page_names',
+        'autoLinker',
+        'contentHash',
+    )
+    # no instance dict, because a project wiki may have thousands of pages
 
-    DESCRIPTION = _('Zim page')
+    DESCRIPTION = N_('Zim page')
     EXTENSION = '.txt'
+    BLOCK_SIZE = 65536
+    # characters read at once when comparing a note file
 
     PAGE_HEADER = (
         'Content-Type: text/x-zim-wiki\n'
         'Wiki-Format: zim 0.4\n'
     )
-    REPLACEMENTS = {
-        '//':'',
-        '**': '',
-    }
     invalidChars = re.compile(r'[\:\?\#\/\\\*\"\<"\>\|\%\t\n\r]')
     # regex for a set of characters that wiki page filenames must not contain
 
     def __init__(self, filePath, element):
         self.filePath = filePath
         self.element = element
-        self.page_names = [self.element.title, _('Untitled')]
+        self.page_names = self.get_page_names(element)
+        self.autoLinker = None
+        # AutoLinker instance, if element names are to be linked
+        self.contentHash = None
+        # hash of the content, as last written by write()
 
     def body(self, text):
         """Parser callback method for a note's body text line."""
         pass
 
-    def fill_page(self, lines):
-        """Add page content to the lines."""
-        # To be overridden by subclasses.
+    def compare(self):
+        """Compare the page content with the note file, without writing.
+
+        Return a tuple:
+        - True if the note file exists, 
+        - True if the note file has the page content,
+        - the number of bytes write() writes, if the content has changed.
+        """
+        textHash, textSize = self._hash_chunks(self.iter_text())
+        DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+        try:
+            fileSize = os.path.getsize(self.filePath)
+        except OSError:
+            return False, False, textSize
+
+        return True, self._has_content(fileSize, textHash, textSize), textSize
+
+    def end(self):
+        """Parser callback method for the end of the note."""
         pass
 
+    def fill_page(self, lines):
+        """Add the page content lines to the list.
+
+        Deprecated; kept for subclasses written for former versions.
+        Override iter_content() instead.
+        """
+        lines.extend(self.iter_content())
+
     def from_wiki(self, text):
         """Return text with Zim-specific formatting removed."""
-        for tag in self.REPLACEMENTS:
-            text = text.replace(tag, self.REPLACEMENTS[tag])
-        return text
+        return strip_formatting(text)
 
     def get_h1(self, text):
         """Return text, formatted as first level heading."""
@@ -58,6 +100,59 @@ class ZimPage:
         """Return text, formatted as third level heading."""
         return f'==== {text} ====\n'
 
+    def get_hash(self):
+        """Return the content hash of the page, rendering it chunk by chunk.
+
+        This is the hash that WikiManifest.get_hash() returns
+        for the text returned by get_text().
+        """
+        pageHash, __ = self._hash_chunks(self.iter_text())
+        return pageHash
+
+    @classmethod
+    def get_descriptor(cls, element, elemId):
+        """Return a PageDescriptor for the element's page.
+
+        The page names are computed without creating a page instance.
+        """
+        pageNames = tuple(cls.get_page_names(element))
+        pageName = cls._get_valid_name(pageNames)
+        if pageName is None:
+            fileName = None
+        else:
+            fileName = cls.get_file_name(pageName)
+        return PageDescriptor(elemId, cls, pageNames, pageName, fileName, ())
+
+    @classmethod
+    def get_file_name(cls, pageName):
+        """Return the file name of the page specified by pageName."""
+        return f"{pageName.replace(' ', '_')}{cls.EXTENSION}"
+
+    @classmethod
+    def get_page_name(cls, element):
+        """Return a valid page name for the element.
+        
+        This is the name new_page_name() returns, 
+        without creating a page instance.
+        """
+        return cls._get_valid_name(cls.get_page_names(element))
+
+    @classmethod
+    def get_page_names(cls, element):
+        """Return a list of page name candidates for the element."""
+        return [element.title, _('Untitled')]
+
+    def get_text(self):
+        """Return the page content as a single string.
+
+        Page content:
+        - The Zim note header 
+        - A first level heading with the note title 
+          as specified by the new_page_name() method.
+        - Note text as specified by the iter_content() method.
+        """
+        return ''.join(self.iter_text())
+
     def h1(self, heading):
         """Parser callback method for a note's first level heading."""
         if self.element.title is None:
@@ -71,57 +166,253 @@ class ZimPage:
         """Parser callback method for a note's third level heading."""
         pass
 
+    def iter_content(self):
+        """Generate the page content lines, without page header and title.
+
+        The lines are separated by newlines when written.
+        """
+        # To be overridden by subclasses.
+        yield from ()
+
+    def iter_text(self):
+        """Generate the page content in chunks.
+
+        The chunks joined are the text returned by get_text().
+        """
+        yield self.PAGE_HEADER
+        yield '\n'
+        yield self.get_h1(self.new_page_name())
+        if type(self).fill_page is ZimPage.fill_page:
+            lines = self.iter_content()
+        else:
+            # a subclass overriding the former fill_page() method
+            lines = []
+            self.fill_page(lines)
+        for line in lines:
+            yield '\n'
+            yield line
+
     def new_page_name(self):
         """Return a valid name for a new page."""
         # Override this if another name is required.
-        for pageName in self.page_names:
-            if pageName is not None:
-                return self.invalidChars.sub('', pageName)
+        return self._get_valid_name(self.page_names)
 
-    def parse_line(self, line):
-        """An event-driven line parser."""
-        if line.startswith('====== '):
-            heading = line.strip('= ')
-            self.h1(heading)
+    def link(self, target):
+        """Parser callback method for a link in a body text line."""
+        pass
+
+    def link_names(self, text):
+        """Return text with the mentions of element names linked.
 
-        if line.startswith('===== '):
-            heading = line.strip('= ')
-            self.h2(heading)
+        Without autoLinker, text is returned unchanged.
+        """
+        if self.autoLinker is None:
+            return text
 
-        if line.startswith('==== '):
-            heading = line.strip('= ')
-            self.h3(heading)
+        return self.autoLinker.link(text, self.element)
 
-        elif not line.startswith('='):
-            self.body(line)
+    def parse(self, text):
+        """Modify the element with data parsed from the note text.
+        
+        The tokens are passed to the parser callback methods.
+        Body text is passed with links and formatting removed.
+        """
+        self.start()
+        body = self.body
+        # bound once, because most tokens are body text lines
+        try:
+            for kind, level, value in tokenize(text):
+                if kind == BODY:
+                    body(value)
+                elif kind == HEADING:
+                    if level == 1:
+                        self.h1(value)
+                    elif level == 2:
+                        self.h2(value)
+                    elif level == 3:
+                        self.h3(value)
+                elif kind == TAGS:
+                    self.tags(value)
+                elif kind == LINK:
+                    self.link(value)
+        except StopParsing:
+            pass
+        self.end()
 
+    @DIAGNOSTICS.timed('ZimPage.read')
     def read(self):
         """Modify the element with data read from the note file."""
+        DIAGNOSTICS.count(DIAGNOSTICS.READ)
         with open (self.filePath, 'r', encoding='utf-8') as f:
             text = f.read()
-        lines = text.split('\n')
-        for line in lines:
-            try:
-                self.parse_line(line)
-            except StopParsing:
-                return
+        self.parse(text)
 
-    def write(self):
-        """Write the note.
-        
-        Page content:
-        - The Zim note header 
-        - A first level heading with the note title 
-          as specified by the new_page_name() method.
-        - Note text as specified by the fill_page() method.
+    def start(self):
+        """Parser callback method for the start of the note."""
+        pass
+
+    def tags(self, tags):
+        """Parser callback method for a line of tags."""
+        pass
+
+    @DIAGNOSTICS.timed('ZimPage.write')
+    def write(self, text=None, baseHash=None):
+        """Write the note, if its content has changed.
         
-        Overwrite existing note.
+        Optional arguments:
+            text: str -- Page content as returned by get_text().
+            baseHash: str -- Content hash of the note file, 
+                             as generated before.
+
+        Without text, the page is rendered chunk by chunk.
+        The page is rendered once: the chunks are hashed while they are
+        buffered. When the buffer exceeds BLOCK_SIZE characters, it is
+        written to a temporary file, so that the memory needed does not
+        grow with the page size. The temporary file replaces the note
+        file only if the content differs. So an interruption does not
+        leave a half-written note, and contentHash is the hash of the
+        content rendered.
+
+        With baseHash, the content is compared with the hash instead
+        of the note file. A note file that no longer has the base hash
+        has been modified in Zim, and is not overwritten either.
+        Return True if the note file is written.
         """
-        lines = [
-            self.PAGE_HEADER,
-            f'{self.get_h1(self.new_page_name())}',
-        ]
-        self.fill_page(lines)
-        text = '\n'.join(lines)
-        with open (self.filePath, 'w', encoding='utf-8') as f:
-            f.write(text)
+        dirPath, fileName = os.path.split(self.filePath)
+        tempPath = os.path.join(dirPath, f'.{fileName}.tmp')
+        # hidden, so that Zim does not show it as an attachment
+        buffer = []
+        bufferSize = 0
+        tempFile = None
+
+        def spool(chunk):
+            nonlocal bufferSize, tempFile
+            if tempFile is not None:
+                tempFile.write(chunk)
+                return
+
+            buffer.append(chunk)
+            bufferSize += len(chunk)
+            if bufferSize > self.BLOCK_SIZE:
+                tempFile = open(tempPath, 'w', encoding='utf-8')
+                tempFile.writelines(buffer)
+                buffer.clear()
+
+        try:
+            try:
+                self.contentHash, textSize = self._hash_chunks(
+                    self._get_chunks(text),
+                    spool,
+                )
+            finally:
+                if tempFile is not None:
+                    tempFile.close()
+            if self._is_unchanged(textSize, baseHash):
+                if tempFile is not None:
+                    os.remove(tempPath)
+                return False
+
+            if tempFile is None:
+                with open (tempPath, 'w', encoding='utf-8') as f:
+                    f.writelines(buffer)
+            DIAGNOSTICS.count(DIAGNOSTICS.BYTES_WRITTEN, textSize)
+            os.replace(tempPath, self.filePath)
+        except:
+            if os.path.isfile(tempPath):
+                os.remove(tempPath)
+            raise
+
+        DIAGNOSTICS.count(DIAGNOSTICS.WRITE)
+        return True
+
+    def _get_chunks(self, text):
+        """Return an iterable of text chunks to be written."""
+        if text is None:
+            return self.iter_text()
+
+        return (text,)
+
+    @classmethod
+    def _get_valid_name(cls, pageNames):
+        """Return the first page name candidate, made valid, or None."""
+        for pageName in pageNames:
+            if pageName is not None:
+                return cls.invalidChars.sub('', pageName)
+
+    def _get_file_hash(self):
+        """Return the content hash of the note file, or None."""
+        DIAGNOSTICS.count(DIAGNOSTICS.READ)
+        try:
+            with open (self.filePath, 'r', encoding='utf-8') as f:
+                fileHash, __ = self._hash_chunks(
+                    iter(lambda: f.read(self.BLOCK_SIZE), '')
+                )
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        return fileHash
+
+    def _has_content(self, fileSize, textHash, textSize):
+        """Return True if the note file has the specified content.
+
+        Positional arguments:
+            fileSize: int -- Size of the existing note file.
+            textHash: str -- Content hash, as returned by _hash_chunks().
+            textSize: int -- File size, as returned by _hash_chunks().
+        """
+        if fileSize != textSize:
+            return False
+
+        return self._get_file_hash() == textHash
+
+    def _hash_chunks(self, chunks, write=None):
+        """Return a tuple: content hash, and file size of the text chunks.
+
+        Positional arguments:
+            chunks -- iterable of text chunks.
+
+        Optional arguments:
+            write -- function to be called with each chunk.
+        """
+        import hashlib
+        # deferred; after the first call, this is a module cache lookup
+
+        textHash = hashlib.sha1()
+        textSize = 0
+        newlineSize = len(os.linesep) - 1
+        for chunk in chunks:
+            if write is not None:
+                write(chunk)
+            data = chunk.encode('utf-8')
+            textHash.update(data)
+            textSize += len(data)
+            if newlineSize:
+                textSize += chunk.count('\n') * newlineSize
+        return textHash.hexdigest(), textSize
+
+    def _is_unchanged(self, textSize, baseHash):
+        """Return True if the note file is to be left as it is.
+
+        Positional arguments:
+            textSize: int -- File size of the content rendered.
+            baseHash: str -- Content hash of the note file, 
+                             as generated before, or None.
+        """
+        if baseHash is not None:
+            if self.contentHash == baseHash:
+                return True
+
+            fileHash = self._get_file_hash()
+            if fileHash is not None and fileHash != baseHash:
+                # The note file has been modified in Zim.
+                return True
+
+            return False
+
+        DIAGNOSTICS.count(DIAGNOSTICS.STAT)
+        try:
+            fileSize = os.path.getsize(self.filePath)
+        except OSError:
+            return False
+
+        return self._has_content(fileSize, self.contentHash, textSize)
@@ -0,0 +1,106 @@
+"""Provide a single-pass tokenizer for Zim wiki text.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+from functools import lru_cache
+import re
+
+HEADING = 'heading'
+TAGS = 'tags'
+LINK = 'link'
+BODY = 'body'
+
+TAGS_PATTERN = re.compile(r'@\S+(?:[ \t]+@\S+)*[ \t]*$')
+# regex for a line consisting of tags only
+
+LINK_PATTERN = re.compile(r'\[\[([^\]|]*)(?:\|([^\]]*))?\]\]')
+# regex for a link with optional label
+
+FORMAT_PATTERN = re.compile(r'\*\*|(?<!:)//')
+# regex for the formatting markup to be removed;
+# "//" after a colon is part of an URL
+
+TAG_SEPARATOR_PATTERN = re.compile(r'\W+')
+# regex for a sequence of characters that a Zim tag must not contain
+
+
+@lru_cache(maxsize=1024)
+def normalize_tag(tag):
+    """Return the tag as written to the page, i.e. with underscores
+    replacing non-alphanumeric characters.
+
+    The result is cached, because a tag is usually
+    normalized for many elements.
+    """
+    return TAG_SEPARATOR_PATTERN.sub('_', tag)
+
+
+def strip_formatting(text):
+    """Return text with links replaced by their labels and markup removed."""
+    if '[[' in text:
+        text = LINK_PATTERN.sub(_replace_link, text)
+    if '**' in text or '//' in text:
+        text = FORMAT_PATTERN.sub('', text)
+    return text
+
+
+def tokenize(text):
+    """Generate (kind, level, value) tokens for the lines of a Zim wiki text.
+
+    kind: HEADING, TAGS, LINK, or BODY.
+    level: heading level 1..5 for HEADING, otherwise 0.
+    value: heading text, list of tag names, link target, or plain body text.
+
+    Each line is classified once; only lines starting with "=" or "@" 
+    are checked for headings and tags. A line without "[", "*", or "/"
+    is passed as it is, because a single character is found much faster
+    than the markup.
+    Links found in a body line are generated as LINK tokens
+    preceding the line's BODY token.
+    The tokens are plain tuples, which are much faster to create
+    than named tuples.
+    """
+    for line in text.split('\n'):
+        firstChar = line[:1]
+        if firstChar == '=':
+            # A heading is "=" * (7 - level), a space, the heading text,
+            # and optionally a space followed by any number of "=".
+            value = line.lstrip('=')
+            level = 7 - len(line) + len(value)
+            if 0 < level < 6 and value[:1] == ' ':
+                value = value[1:].rstrip(' \t')
+                if value[-1:] == '=':
+                    heading = value.rstrip('=')
+                    if heading[-1:] == ' ':
+                        value = heading[:-1]
+                yield (HEADING, level, value)
+                continue
+
+        elif firstChar == '@':
+            if TAGS_PATTERN.match(line) is not None:
+                yield (TAGS, 0, [tag[1:] for tag in line.split()])
+                continue
+
+        if '[' in line and '[[' in line:
+            parts = LINK_PATTERN.split(line)
+            # text, target, label, text, target, label, ..., text
+            chunks = [parts[0]]
+            for i in range(1, len(parts), 3):
+                target = parts[i]
+                yield (LINK, 0, target)
+                chunks.append(parts[i + 1] or target)
+                chunks.append(parts[i + 2])
+            line = ''.join(chunks)
+        if ('*' in line or '/' in line) and ('**' in line or '//' in line):
+            if '://' in line or '*/' in line or '/*' in line:
+                line = FORMAT_PATTERN.sub('', line)
+            else:
+                # The markup cannot overlap, so replacing is equivalent.
+                line = line.replace('**', '').replace('//', '')
+        yield (BODY, 0, line)
+
+
+def _replace_link(match):
+    return match.group(2) or match.group(1)
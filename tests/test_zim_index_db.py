@@ -0,0 +1,193 @@
+"""Unit tests for the lookups through Zim's SQLite page index.
+
+The tests build a small index database, as Zim keeps it
+in the ".zim" cache directory of a notebook.
+
+usage: python -m unittest discover -s tests
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, f'{os.path.dirname(TEST_DIR)}/src')
+
+from nvzim.zim_index_db import ZimIndexDb
+from nvzim.zim_notebook import ZimNotebook
+
+PAGES = [
+    # id, basename, sortkey, parent, is_link_placeholder
+    (1, '', '', 0, 0),
+    (2, 'Home', 'home', 1, 0),
+    (3, 'Characters', 'characters', 2, 0),
+    (4, 'Char One', 'char one', 3, 0),
+    (5, 'Bob', 'bob', 3, 0),
+    (6, 'Char One', 'char one', 1, 0),
+    (7, 'Locations', 'locations', 2, 0),
+    (8, 'Char Two', 'char two', 7, 1),
+]
+LINKS = [
+    # source, target
+    (5, 4),
+    (6, 4),
+    (2, 3),
+]
+NOTEBOOK = '''[Notebook]
+version = 0.4
+name = Notebook
+interwiki =
+home = Home
+icon =
+document_root =
+shared = True
+endofline = dos
+disable_trash = False
+profile =
+'''
+
+
+def write_index(dirPath):
+    """Create the fixture index database in the notebook directory."""
+    os.makedirs(f'{dirPath}/.zim')
+    db = sqlite3.connect(f'{dirPath}/{ZimIndexDb.INDEX_PATH}')
+    with db:
+        db.execute(
+            'CREATE TABLE pages (id INTEGER PRIMARY KEY, basename TEXT, '
+            'sortkey TEXT, parent INTEGER, '
+            'is_link_placeholder BOOLEAN DEFAULT 0)'
+        )
+        db.execute('CREATE TABLE links (source INTEGER, target INTEGER)')
+        db.executemany('INSERT INTO pages VALUES (?, ?, ?, ?, ?)', PAGES)
+        db.executemany('INSERT INTO links VALUES (?, ?)', LINKS)
+    db.close()
+
+
+class ZimIndexDbTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.dirPath = f'{self.tempDir}/my notebook #1'
+        write_index(self.dirPath)
+        self.zimIndex = ZimIndexDb(self.dirPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def test_find_pages(self):
+        self.assertEqual(
+            self.zimIndex.find_pages('char_one'),
+            ['Char One', 'Home:Characters:Char One'],
+        )
+        self.assertEqual(
+            self.zimIndex.find_pages('Char One', namespace='Home'),
+            ['Home:Characters:Char One'],
+        )
+        self.assertEqual(self.zimIndex.find_pages('Char Two'), [])
+
+    def test_get_backlinks(self):
+        self.assertEqual(
+            self.zimIndex.get_backlinks('home:characters:Char_One'),
+            ['Char One', 'Home:Characters:Bob'],
+        )
+        self.assertEqual(self.zimIndex.get_backlinks('Home:Nobody'), [])
+
+    def test_get_full_name(self):
+        self.assertEqual(
+            self.zimIndex.get_full_name('home:characters:char_one'),
+            'Home:Characters:Char One',
+        )
+        self.assertIsNone(self.zimIndex.get_full_name('Home:Char One'))
+
+    def test_get_namespace_pages(self):
+        self.assertEqual(
+            self.zimIndex.get_namespace_pages('Home:Characters'),
+            ['Home:Characters:Bob', 'Home:Characters:Char One'],
+        )
+        self.assertEqual(
+            self.zimIndex.get_namespace_pages('Home:Locations'),
+            [],
+        )
+
+    def test_missing_index(self):
+        zimIndex = ZimIndexDb(self.tempDir)
+        self.assertFalse(zimIndex.is_available())
+        self.assertIsNone(zimIndex.find_pages('Char One'))
+        self.assertIsNone(zimIndex.get_backlinks('Char One'))
+        self.assertIsNone(zimIndex.get_namespace_pages('Home'))
+        self.assertIsNone(zimIndex.get_mtime())
+
+
+class ZimNotebookIndexTest(unittest.TestCase):
+    """Look up page paths through Zim's index, or the page index if stale."""
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.dirPath = f'{self.tempDir}/my notebook #1'
+        write_index(self.dirPath)
+        with open(f'{self.dirPath}/Notebook.zim', 'w', encoding='utf-8') as f:
+            f.write(NOTEBOOK)
+        homeDir = f'{self.dirPath}/Home'
+        os.makedirs(f'{homeDir}/Characters')
+        for relPath in ('Characters/Char_One.txt', 'Char_One.txt'):
+            with open(f'{homeDir}/{relPath}', 'w', encoding='utf-8') as f:
+                f.write('Content-Type: text/x-zim-wiki\n')
+        # Home/Char_One.txt is not in Zim's index.
+        self.indexedPath = f'{homeDir}/Characters/Char_One.txt'
+        self.unindexedPath = f'{homeDir}/Char_One.txt'
+        self.homeDir = homeDir
+        self.set_mtimes(dirTime=1000, indexTime=2000)
+        self.notebook = ZimNotebook(
+            None,
+            filePath=f'{self.dirPath}/Notebook.zim',
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+
+    def set_mtimes(self, dirTime, indexTime):
+        for dirPath in (self.homeDir, f'{self.homeDir}/Characters'):
+            os.utime(dirPath, (dirTime, dirTime))
+        indexPath = f'{self.dirPath}/{ZimIndexDb.INDEX_PATH}'
+        os.utime(indexPath, (indexTime, indexTime))
+
+    def test_current_index(self):
+        self.assertEqual(
+            self.notebook.get_page_path_by_name('Char One'),
+            self.indexedPath,
+        )
+        self.assertEqual(
+            self.notebook.find_page_name(self.indexedPath),
+            'Home:Characters:Char One',
+        )
+        self.assertEqual(
+            self.notebook.get_namespace_pages(
+                f'{self.homeDir}/Characters.txt'
+            ),
+            [
+                f'{self.homeDir}/Characters/Bob.txt',
+                self.indexedPath,
+            ],
+        )
+
+    def test_stale_index(self):
+        self.set_mtimes(dirTime=3000, indexTime=2000)
+        self.assertEqual(
+            self.notebook.get_page_path_by_name('Char One'),
+            self.unindexedPath,
+        )
+        self.assertEqual(
+            self.notebook.find_page_name(self.indexedPath),
+            'Home:Characters:Char_One',
+        )
+        self.assertIsNone(self.notebook.get_backlinks(self.indexedPath))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Compare the name linking automaton with a regular expression alternation.
+
+usage: bench_auto_linker.py [names]
+
+Link the element names in a page text, for projects with
+an increasing number of names, up to the given number (default: 10000).
+The automaton's time per text should not grow with the number of names.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, f'{os.path.dirname(__file__)}/../../src')
+from nvzim.auto_linker import AutoLinker
+
+REPEAT = 5
+SYLLABLES = (
+    'ka', 'lo', 'mi', 'ren', 'sa', 'tor', 'vel', 'an', 'dri', 'ga',
+    'hel', 'is', 'jo', 'mar', 'nu', 'or', 'pe', 'qui', 'ul', 'wyn',
+)
+TEXT_WORDS = 20000
+# words of the page text
+
+
+def build_linker(names):
+    """Return an AutoLinker for the names."""
+    autoLinker = AutoLinker('Home')
+    for name in names:
+        autoLinker.add_name(name, None, name)
+    autoLinker.compile()
+    return autoLinker
+
+
+def make_names(count):
+    """Return a list of distinct, randomly composed element names."""
+    randomizer = random.Random(count)
+    names = set()
+    while len(names) < count:
+        first = ''.join(randomizer.choices(SYLLABLES, k=2)).capitalize()
+        last = ''.join(randomizer.choices(SYLLABLES, k=3)).capitalize()
+        names.add(f'{first} {last}')
+    return sorted(names)
+
+
+def make_text(names):
+    """Return a prose text mentioning some of the names."""
+    randomizer = random.Random(len(names))
+    words = []
+    for __ in range(TEXT_WORDS):
+        if randomizer.random() < 0.02:
+            words.append(randomizer.choice(names))
+        else:
+            words.append(randomizer.choice(SYLLABLES))
+    return ' '.join(words)
+
+
+def new_regex_linker(names):
+    """Return a function linking the names with one compiled regex."""
+    pattern = re.compile(
+        r'\b(?:%s)\b' % '|'.join(
+            re.escape(name)
+            for name in sorted(names, key=len, reverse=True)
+        )
+    )
+
+    def link(text):
+        return pattern.sub(lambda match: f'[[{match.group()}]]', text)
+
+    return link
+
+
+def main(maxNames=10000):
+    counts = [
+        count for count in (100, 1000, 10000, 100000)
+        if count < maxNames
+    ]
+    counts.append(maxNames)
+    for count in counts:
+        names = make_names(count)
+        text = make_text(names)
+        build = min(timeit.repeat(
+            lambda: build_linker(names),
+            number=1,
+            repeat=REPEAT,
+        ))
+        autoLinker = build_linker(names)
+        automaton = min(timeit.repeat(
+            lambda: autoLinker.link(text),
+            number=1,
+            repeat=REPEAT,
+        ))
+        regexLink = new_regex_linker(names)
+        regex = min(timeit.repeat(
+            lambda: regexLink(text),
+            number=1,
+            repeat=REPEAT,
+        ))
+        print(f'{count} names')
+        print(f'  Text size:         {len(text) / 1024:.0f} kB')
+        print(f'  Automaton build:   {build:.3f} s')
+        print(f'  Automaton linking: {automaton:.3f} s')
+        print(f'  Regex linking:     {regex:.3f} s')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
@@ -0,0 +1,119 @@
+"""Compare the Zim page tokenizer with the former line parser.
+
+usage: bench_parser.py [megabytes]
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, f'{os.path.dirname(__file__)}/../../src')
+from nvzim.zim_page import ZimPage
+
+REPEAT = 5
+
+
+class LegacyPage(ZimPage):
+    """Page with the line parser that was replaced by the tokenizer."""
+
+    REPLACEMENTS = {
+        '//':'',
+        '**': '',
+    }
+
+    def legacy_from_wiki(self, text):
+        for tag in self.REPLACEMENTS:
+            text = text.replace(tag, self.REPLACEMENTS[tag])
+        return text
+
+    def legacy_parse(self, text):
+        text = self.legacy_from_wiki(text)
+        for line in text.split('\n'):
+            self.parse_line(line)
+
+    def parse_line(self, line):
+        if line.startswith('====== '):
+            heading = line.strip('= ')
+            self.h1(heading)
+
+        if line.startswith('===== '):
+            heading = line.strip('= ')
+            self.h2(heading)
+
+        if line.startswith('==== '):
+            heading = line.strip('= ')
+            self.h3(heading)
+
+        elif not line.startswith('='):
+            self.body(line)
+
+
+class Element:
+    title = 'Benchmark'
+
+
+def make_page_text(megabytes, dense=False):
+    """Return a synthetic page of the given size.
+
+    A dense page has headings, tags, links, and formatting on every
+    other line; otherwise, the page is mostly prose.
+    """
+    if dense:
+        section = (
+            '===== Section =====\n'
+            '@tag_one @tag_two\n'
+            'Some **bold** and //italic// text with a [[Link|label]] in it.\n'
+            '==== Subsection ====\n'
+            'Plain text line, long enough to be a realistic paragraph '
+            'as written in a character description or a location note.\n'
+            '\n'
+        )
+    else:
+        paragraph = (
+            'A long paragraph of prose describing the character in detail, '
+            'with many words and no markup at all, as is typical. ' * 3
+        )
+        section = (
+            '===== Section =====\n'
+            '@tag_one @tag_two\n'
+            f'{paragraph}\n\n' * 20
+            + 'Some **bold** words and a [[Link]].\n\n'
+        )
+    size = megabytes * 1024 * 1024
+    return (
+        f'{ZimPage.PAGE_HEADER}\n====== Benchmark ======\n'
+        f'{section * (size // len(section) + 1)}'
+    )
+
+
+def main(megabytes=4):
+    page = LegacyPage(None, Element())
+    for dense in (False, True):
+        text = make_page_text(megabytes, dense)
+        legacy = min(timeit.repeat(
+            lambda: page.legacy_parse(text),
+            number=1,
+            repeat=REPEAT,
+        ))
+        tokenizer = min(timeit.repeat(
+            lambda: page.parse(text),
+            number=1,
+            repeat=REPEAT,
+        ))
+        if dense:
+            print('Markup on every other line')
+        else:
+            print('Mostly prose')
+        print(f'  Page size:   {len(text) / 1024 / 1024:.1f} MB')
+        print(f'  Line parser: {legacy:.3f} s')
+        print(f'  Tokenizer:   {tokenizer:.3f} s')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
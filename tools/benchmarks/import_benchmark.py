@@ -0,0 +1,111 @@
+"""Measure the time needed for importing the nv_zim plugin module.
+
+usage: import_benchmark.py [-h] [--runs N] [--budget MS]
+
+Import the plugin module in fresh Python interpreters, after
+the modules that novelibre has already loaded at plugin start-up,
+and print the median import time. Exit with status 1 if the median
+exceeds the budget documented in CONTRIBUTING.md.
+
+The plugin is measured from the sources, where each nvzim module
+is a separate file. The built plugin is a single file, so this
+is an upper bound.
+
+Requires the novelibre sources as sibling of the nv_zim project,
+as described in CONTRIBUTING.md.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+SOURCE_PATHS = [
+    f'{PROJECT_DIR}/src',
+    f'{os.path.dirname(PROJECT_DIR)}/novelibre/src',
+]
+BUDGET = 20.0
+# milliseconds
+RUNS = 10
+HOST_MODULES = (
+    'configparser',
+    'datetime',
+    'gettext',
+    'platform',
+    'tkinter',
+    'tkinter.filedialog',
+    'tkinter.ttk',
+    'webbrowser',
+    'nvlib.controller.plugin.plugin_base',
+    'nvlib.controller.sub_controller',
+    'nvlib.gui.menus.nv_menu',
+    'nvlib.gui.widgets.nv_simpledialog',
+    'nvlib.novx_globals',
+)
+# modules that are loaded before novelibre installs the plugins
+
+MEASURE_IMPORT = '''
+import importlib
+import sys
+import time
+sys.path[:0] = {paths!r}
+for module in {modules!r}:
+    importlib.import_module(module)
+start = time.perf_counter()
+import nv_zim
+print(time.perf_counter() - start)
+'''
+
+
+def measure_import():
+    """Return the import time in seconds, measured in a new interpreter."""
+    code = MEASURE_IMPORT.format(paths=SOURCE_PATHS, modules=HOST_MODULES)
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure the nv_zim plugin import time.'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=RUNS,
+        metavar='N',
+        help='number of interpreters to start',
+    )
+    parser.add_argument(
+        '--budget',
+        type=float,
+        default=BUDGET,
+        metavar='MS',
+        help='maximum median import time in milliseconds',
+    )
+    args = parser.parse_args()
+    measure_import()
+    # compiling the byte code is not part of the measurement
+    times = [measure_import() * 1000 for __ in range(args.runs)]
+    median = statistics.median(times)
+    print(
+        f'nv_zim import: median {median:.1f} ms, '
+        f'min {min(times):.1f} ms, max {max(times):.1f} ms, '
+        f'budget {args.budget:.1f} ms'
+    )
+    if median > args.budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""Benchmark the nv_zim wiki pipeline with synthetic novels.
+
+usage: wiki_benchmark.py [-h] [--sizes N [N ...]] [--output FILE]
+
+Build synthetic novels in memory, run the wiki operations against
+a temporary directory with a stand-in Zim executable,
+and write the timings as JSON, so that releases can be compared.
+
+Requires the novelibre sources as sibling of the nv_zim project,
+as described in CONTRIBUTING.md.
+
+Copyright (c) 2025 Peter Triesberger
+For further information see https://github.com/peter88213/nv_zim
+License: GNU GPLv3 (https://www.gnu.org/licenses/gpl-3.0.en.html)
+"""
+import argparse
+from configparser import ConfigParser
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, f'{PROJECT_DIR}/src')
+sys.path.insert(0, f'{os.path.dirname(PROJECT_DIR)}/novelibre/src')
+
+from nvzim.book_page import BookPage
+from nvzim.wiki_manager import WikiManager
+from nvzim.zim_page import ZimPage
+
+SIZES = (100, 1000, 10000)
+LOOKUPS = 1000
+DESCRIPTION = (
+    'A long description of the element, written in plain prose, '
+    'as it may be found in a real novel project. ' * 20
+)
+
+
+class Element:
+    """Stand-in for a novelibre world element."""
+
+    def __init__(self, title, desc, aka=None, tags=None):
+        self.title = title
+        self.desc = desc
+        self.aka = aka
+        self.tags = tags
+        self.fields = {}
+
+
+class Character(Element):
+    """Stand-in for a novelibre character."""
+
+    def __init__(self, title, desc, aka=None, tags=None):
+        super().__init__(title, desc, aka, tags)
+        self.fullName = f'{title} Fullname'
+        self.bio = DESCRIPTION
+        self.goals = DESCRIPTION
+        self.birthDate = '1900-01-01'
+        self.deathDate = None
+
+
+class Novel(Element):
+    """Stand-in for the novelibre novel."""
+
+    def __init__(self, size):
+        super().__init__('Benchmark Novel', DESCRIPTION)
+        self.crField1 = 'Bio'
+        self.crField2 = 'Goals'
+        self.plotLines = {}
+        self.characters = {}
+        self.locations = {}
+        self.items = {}
+        for i in range(size):
+            self.characters[f'cr{i + 1}'] = Character(
+                f'Character {i}',
+                DESCRIPTION,
+                aka=f'C{i}',
+                tags=['protagonist', f'group {i % 10}'],
+            )
+            self.locations[f'lc{i + 1}'] = Element(
+                f'Location {i}',
+                DESCRIPTION,
+                tags=[f'region {i % 10}'],
+            )
+            self.items[f'it{i + 1}'] = Element(f'Item {i}', DESCRIPTION)
+
+
+class Model:
+    """Stand-in for the novelibre model."""
+
+    def __init__(self, size, prjFilePath):
+        self.novel = Novel(size)
+        self.prjFile = PrjFile(prjFilePath)
+
+
+class PrjFile:
+
+    def __init__(self, filePath):
+        self.filePath = filePath
+
+
+class LinkProcessor:
+
+    def expand_path(self, filePath):
+        return filePath
+
+    def shorten_path(self, filePath):
+        return filePath
+
+
+class Controller:
+    """Stand-in for the novelibre controller."""
+
+    isLocked = False
+
+    def __init__(self, zimApp):
+        self.linkProcessor = LinkProcessor()
+        self._launchers = {'.zim': zimApp}
+
+    def check_lock(self):
+        return False
+
+    def get_launchers(self):
+        return self._launchers
+
+
+class PropertiesView:
+
+    def apply_changes(self):
+        pass
+
+
+class Root:
+    """Stand-in for the Tk root window; the timers never expire."""
+
+    def after(self, ms, func=None, *args):
+        return 'after'
+
+    def after_cancel(self, afterId):
+        pass
+
+
+class View:
+    """Stand-in for the novelibre main view."""
+
+    def __init__(self):
+        self.propertiesView = PropertiesView()
+        self.root = Root()
+
+    def ask_yes_no(self, message, title=None, detail=None):
+        return True
+
+    def restore_status(self, event=None):
+        pass
+
+    def set_status(self, message):
+        pass
+
+    def show_info(self, message, title=None, detail=None):
+        pass
+
+
+def create_zim_stand_in(dirPath):
+    """Return the path of an executable that exits immediately."""
+    if platform.system() == 'Windows':
+        zimApp = f'{dirPath}/zim.bat'
+        with open(zimApp, 'w') as f:
+            f.write('@exit 0\n')
+    else:
+        zimApp = f'{dirPath}/zim'
+        with open(zimApp, 'w') as f:
+            f.write('#!/bin/sh\nexit 0\n')
+        os.chmod(zimApp, 0o755)
+    return zimApp
+
+
+def measure(function, *args):
+    """Return the wall time in seconds of a function call."""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def run(size, workDir):
+    """Return a dict with the timings for a novel of the given size."""
+    zimApp = create_zim_stand_in(workDir)
+    model = Model(size, f'{workDir}/benchmark.novx')
+    wikiManager = WikiManager(
+        model,
+        View(),
+        Controller(zimApp),
+        'Benchmark',
+    )
+    wikiManager.zim_is_installed()
+    results = dict(size=size)
+
+    results['create_project_wiki'] = measure(wikiManager.create_project_wiki)
+    results['plan_project_wiki'] = measure(wikiManager.plan_project_wiki)
+    prjWiki = wikiManager.prjWiki
+    pageNames = [
+        model.novel.characters[elemId].fullName
+        for elemId in model.novel.characters
+    ][:LOOKUPS]
+
+    bookPage = BookPage(f'{prjWiki.homeDir}/Book.txt', model.novel)
+    results['book_page_hash'] = measure(bookPage.get_hash)
+
+    prjWiki.pageIndex = type(prjWiki.pageIndex)(
+        prjWiki.homeDir,
+        f'{workDir}/cold_index.json',
+    )
+    results['get_page_path_by_name_cold'] = measure(
+        prjWiki.get_page_path_by_name,
+        pageNames[0],
+    )
+    results['get_page_path_by_name_warm'] = measure(
+        lookup_pages,
+        prjWiki,
+        pageNames,
+    ) / len(pageNames)
+
+    pagePath = model.novel.characters['cr1'].fields['zim-page-abs']
+    wikiManager.notebookRegistry.invalidate()
+    results['open_page_file_cold'] = measure(
+        wikiManager.open_page_file,
+        pagePath,
+    )
+    results['open_page_file_warm'] = measure(
+        wikiManager.open_page_file,
+        pagePath,
+    )
+
+    page = ZimPage(pagePath, model.novel.characters['cr1'])
+    results['zim_page_read'] = measure(page.read)
+    results['sync_project_wiki_unchanged'] = measure(
+        wikiManager.sync_project_wiki
+    )
+    return results
+
+
+def lookup_pages(prjWiki, pageNames):
+    for pageName in pageNames:
+        prjWiki.get_page_path_by_name(pageName)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the nv_zim wiki pipeline.'
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=SIZES,
+        metavar='N',
+        help='numbers of characters, locations, and items each',
+    )
+    parser.add_argument(
+        '--output',
+        metavar='FILE',
+        help='JSON output file; default: standard output',
+    )
+    args = parser.parse_args()
+    versionInfo = ConfigParser()
+    versionInfo.read(f'{PROJECT_DIR}/VERSION')
+    version = versionInfo.get('LATEST', 'version', fallback=None)
+    report = dict(
+        version=version,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        unit='seconds',
+        results=[],
+    )
+    for size in args.sizes:
+        workDir = tempfile.mkdtemp(prefix='nv_zim_benchmark_')
+        try:
+            report['results'].append(run(size, workDir.replace('\\', '/')))
+        finally:
+            shutil.rmtree(workDir, ignore_errors=True)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()